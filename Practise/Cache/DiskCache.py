@@ -0,0 +1,249 @@
+"""
+Кэш результатов расчета на локальном диске с адресацией по содержимому.
+
+Ключ — stable_hash исходных данных: одинаковый в любом процессе и при любом
+запуске (в отличие от встроенного hash). Значения хранятся файлами pickle
+<каталог>/<2 символа ключа>/<ключ>.pkl; запись атомарная (временный файл
+и os.replace), поэтому несколько процессов пула могут одновременно читать
+и писать один каталог. Размер каталога ограничен max_bytes: при
+превышении удаляются давно не читавшиеся записи (LRU по времени
+модификации, которое обновляется при каждом попадании).
+"""
+from __future__ import annotations
+from dataclasses import fields, is_dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Optional
+import hashlib
+import os
+import pickle
+import struct
+import time
+import types
+import uuid
+
+import numpy as np
+
+from Practise import instrumentation
+from Practise.Catalogue.loader import cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: очистка без блокировки, запись все равно атомарная
+    fcntl = None
+
+# версия формата ключей: меняется, если меняется кодирование в stable_hash
+HASH_VERSION = 1
+_MISSING = object()
+# временные файлы старше этого, с, — брошенные прерванными процессами
+ORPHAN_AGE = 600
+
+
+def _feed(h, obj) -> None:
+    # у каждого типа свой префикс, чтобы 1, 1.0, "1" и (1,) давали разные ключи
+    cache_key = getattr(obj, "cache_key", None)
+    if callable(cache_key):
+        h.update(b"K" + type(obj).__qualname__.encode() + b"\0")
+        _feed(h, cache_key())
+    elif obj is None:
+        h.update(b"N")
+    elif isinstance(obj, bool):
+        h.update(b"B1" if obj else b"B0")
+    elif isinstance(obj, (int, np.integer)):
+        h.update(b"I" + str(int(obj)).encode() + b"\0")
+    elif isinstance(obj, (float, np.floating)):
+        h.update(b"F" + struct.pack("<d", float(obj)))
+    elif isinstance(obj, str):
+        data = obj.encode()
+        h.update(b"S" + struct.pack("<Q", len(data)) + data)
+    elif isinstance(obj, bytes):
+        h.update(b"Y" + struct.pack("<Q", len(obj)) + obj)
+    elif isinstance(obj, Path):
+        _feed(h, str(obj))
+    elif isinstance(obj, np.ndarray):
+        data = np.ascontiguousarray(obj)
+        h.update(b"A" + data.dtype.str.encode() + str(data.shape).encode() + b"\0")
+        if data.dtype.kind == "U" or data.dtype.kind == "S":
+            _feed(h, data.tolist())
+        else:
+            h.update(data.data)
+    elif isinstance(obj, (list, tuple)):
+        h.update((b"L" if isinstance(obj, list) else b"T") + struct.pack("<Q", len(obj)))
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, dict):
+        items = sorted((stable_hash(k), v) for k, v in obj.items())
+        h.update(b"D" + struct.pack("<Q", len(items)))
+        for k, v in items:
+            h.update(k.encode())
+            _feed(h, v)
+    elif isinstance(obj, (set, frozenset)):
+        _feed(h, ("set", sorted(stable_hash(item) for item in obj)))
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        # поля, участвующие в сравнении (служебные поля объявлены compare=False)
+        h.update(b"C" + type(obj).__qualname__.encode() + b"\0")
+        for f in fields(obj):
+            if f.compare:
+                _feed(h, f.name)
+                _feed(h, getattr(obj, f.name))
+    else:
+        raise TypeError(f"Нельзя вычислить устойчивый хэш для {type(obj).__name__}")
+
+
+def stable_hash(*objs) -> str:
+    """
+    Устойчивый хэш исходных данных: числа, строки, массивы numpy, списки,
+    словари, dataclass (LoadType, HydroPowerPlant, DieselPowerUnit, BES, ...)
+    и объекты с методом cache_key() (HourlyDemand, HydroPowerPlant).
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(b"v%d" % HASH_VERSION)
+    _feed(h, objs)
+    return h.hexdigest()
+
+
+def code_hash(fn) -> str:
+    """
+    Хэш байт-кода функции (вместе с вложенными функциями и константами):
+    меняется при изменении тела функции, а не при переносе строк или комментариях.
+    """
+    h = hashlib.blake2b(digest_size=12)
+
+    def feed(code):
+        h.update(code.co_code)
+        h.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                feed(const)
+            else:
+                h.update(repr(const).encode())
+    feed(getattr(fn, "__wrapped__", fn).__code__)
+    return h.hexdigest()
+
+
+class DiskCache:
+    """Кэш на диске: get/set по ключу stable_hash, get_or_compute и декоратор memoize."""
+
+    def __init__(self, path=None, max_bytes: int = 512 * 2**20):
+        self.path = Path(path) if path is not None else cache_dir() / "memo"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # записано этим процессом с последней очистки, байт
+        self._written = 0
+
+    def _file(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str, default=None):
+        file = self._file(key)
+        try:
+            with file.open("rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            instrumentation.count("disk_cache.miss")
+            return default
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # поврежденная или устаревшая запись — как промах
+            instrumentation.count("disk_cache.miss")
+            file.unlink(missing_ok=True)
+            return default
+        instrumentation.count("disk_cache.hit")
+        try:
+            os.utime(file)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def set(self, key: str, value) -> None:
+        file = self._file(key)
+        file.parent.mkdir(exist_ok=True)
+        tmp = file.with_name(f".{key}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.write_bytes(data)
+        os.replace(tmp, file)
+        self._written += len(data)
+        # полный обход каталога — только когда записано заметное число байт
+        if self._written > self.max_bytes // 10:
+            self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def memoize(self, fn: Optional[Callable] = None, *, name: Optional[str] = None,
+                version=None):
+        """
+        Декоратор: результат fn(*args, **kwargs) по ключу stable_hash(имя,
+        версия, аргументы). По умолчанию версия — хэш байт-кода fn (code_hash),
+        так что после правки функции старые записи не используются; явная
+        version нужна, если меняются вызываемые из fn функции.
+        """
+        def decorator(fn):
+            label = name or f"{fn.__module__}.{fn.__qualname__}"
+            salt = version if version is not None else code_hash(fn)
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = stable_hash(label, salt, args, kwargs)
+                return self.get_or_compute(key, lambda: fn(*args, **kwargs))
+            return wrapper
+        return decorator(fn) if fn is not None else decorator
+
+    def _files(self):
+        # записи и временные файлы записи (в том числе брошенные прерванными процессами)
+        yield from self.path.glob("*/*.pkl")
+        yield from self.path.glob("*/.*.tmp")
+
+    def size(self) -> int:
+        total = 0
+        for file in self._files():
+            try:
+                total += file.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def evict(self) -> None:
+        """
+        Удалить брошенные временные файлы (старше ORPHAN_AGE) и давно не
+        использовавшиеся записи, пока размер больше 90 % max_bytes.
+        """
+        self._written = 0
+        with (self.path / ".lock").open("a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = []
+            total = 0
+            orphaned = time.time_ns() - ORPHAN_AGE * 10**9
+            for file in self._files():
+                try:
+                    st = file.stat()
+                except FileNotFoundError:
+                    continue
+                if file.suffix == ".tmp":
+                    # незавершенная запись: свежую не трогаем, старую удаляем всегда
+                    if st.st_mtime_ns < orphaned:
+                        file.unlink(missing_ok=True)
+                        instrumentation.count("disk_cache.orphans")
+                    else:
+                        total += st.st_size
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, file))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, file in entries:
+                if total <= self.max_bytes * 0.9:
+                    break
+                # открытые другими процессами файлы дочитываются и после удаления
+                file.unlink(missing_ok=True)
+                total -= size
+                instrumentation.count("disk_cache.evicted")
+
+    def clear(self) -> None:
+        for file in self._files():
+            file.unlink(missing_ok=True)
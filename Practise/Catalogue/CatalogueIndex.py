@@ -0,0 +1,117 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+# индексы списков-каталогов для CatalogueIndex.of: (id списка, ключ) ->
+# (список, id записей, индекс); список хранится, чтобы его id не переиспользовался
+_INDEXES: OrderedDict = OrderedDict()
+_INDEXES_SIZE = 8
+
+
+class CatalogueIndex:
+    """
+    Каталог оборудования (DieselPowerUnit, BES, PCS), отсортированный по ключевому
+    параметру. Пороговые и диапазонные запросы по ключу — бинарным поиском,
+    отбор по нескольким параметрам — булевыми масками по колонкам numpy.
+    """
+
+    def __init__(self, records: Iterable[Any], key: str) -> None:
+        records = list(records)
+        keys = np.array([getattr(r, key) for r in records], dtype=float)
+        order = np.argsort(keys, kind="stable")
+        self.key = key
+        self.records = [records[i] for i in order]
+        self.keys = keys[order]
+        self._columns: dict[str, np.ndarray] = {key: self.keys}
+
+    @classmethod
+    def of(cls, records, key: str) -> CatalogueIndex:
+        """
+        Индекс каталога records по key: готовый индекс возвращается как есть,
+        для списка — индекс, построенный при прошлом вызове с тем же списком
+        (тем же составом записей). Правка ключевого параметра записи на месте
+        не отслеживается: после нее нужен новый CatalogueIndex.
+        """
+        if isinstance(records, CatalogueIndex) and records.key == key:
+            return records
+        if not isinstance(records, list):
+            return cls(records, key)
+        cache_key = (id(records), key)
+        ids = tuple(map(id, records))
+        cached = _INDEXES.get(cache_key)
+        if cached is not None and cached[1] == ids:
+            _INDEXES.move_to_end(cache_key)
+            return cached[2]
+        index = cls(records, key)
+        _INDEXES[cache_key] = (records, ids, index)
+        if len(_INDEXES) > _INDEXES_SIZE:
+            _INDEXES.popitem(last=False)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+    def column(self, name: str) -> np.ndarray:
+        """Колонка параметра name в порядке индекса (строится один раз)."""
+        col = self._columns.get(name)
+        if col is None:
+            col = np.array([getattr(r, name) for r in self.records])
+            self._columns[name] = col
+        return col
+
+    # ---------- запросы по ключу ----------
+    def smallest_at_least(self, value: float,
+                          mask: Optional[np.ndarray] = None) -> Optional[Any]:
+        """Наименьшая запись с ключом >= value (с учетом маски), иначе None."""
+        pos = int(np.searchsorted(self.keys, value, side="left"))
+        if mask is None:
+            return self.records[pos] if pos < len(self.records) else None
+        hits = np.flatnonzero(mask[pos:])
+        return self.records[pos + hits[0]] if hits.size else None
+
+    def at_least(self, value: float) -> list:
+        return self.records[int(np.searchsorted(self.keys, value, side="left")):]
+
+    def between(self, low: float, high: float) -> list:
+        """Записи с low <= ключ <= high."""
+        lo = int(np.searchsorted(self.keys, low, side="left"))
+        hi = int(np.searchsorted(self.keys, high, side="right"))
+        return self.records[lo:hi]
+
+    # ---------- отбор по нескольким параметрам ----------
+    def mask(self, **conditions) -> np.ndarray:
+        """
+        Маска записей по условиям вида параметр=значение (равенство)
+        или параметр=(min, max) (включительно, None — без ограничения), например
+        mask(number_of_phases=3, rated_voltage=0.4, price=(None, 50000)).
+        """
+        result = np.ones(len(self.records), dtype=bool)
+        for name, cond in conditions.items():
+            col = self.column(name)
+            if isinstance(cond, tuple):
+                low, high = cond
+                if low is not None:
+                    result &= col >= low
+                if high is not None:
+                    result &= col <= high
+            else:
+                result &= col == cond
+        return result
+
+    def filter(self, **conditions) -> "CatalogueIndex":
+        """Подкаталог записей, удовлетворяющих условиям mask, с тем же ключом."""
+        keep = np.flatnonzero(self.mask(**conditions))
+        sub = CatalogueIndex.__new__(CatalogueIndex)
+        sub.key = self.key
+        sub.records = [self.records[i] for i in keep]
+        sub.keys = self.keys[keep]
+        sub._columns = {name: col[keep] for name, col in self._columns.items()}
+        return sub
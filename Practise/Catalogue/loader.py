@@ -0,0 +1,311 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from Practise.Generators.Diesel.DieselPowerUnit import DieselPowerUnit
+from Practise.Storage.BES import BES
+from Practise.Invertors.PCS import PCS
+from Practise.Catalogue.CatalogueIndex import CatalogueIndex
+from Practise import instrumentation
+
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def cache_dir() -> Path:
+    """Каталог локального кэша: $PRACTISE_CACHE_DIR или ~/.cache/Practise."""
+    path = Path(os.environ.get("PRACTISE_CACHE_DIR") or Path.home() / ".cache" / "Practise")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@dataclass(frozen=True)
+class CatalogueSpec:
+    """Описание каталога оборудования в книге Excel."""
+    file: str
+    # поле -> заголовок столбца или (заголовок, смещение) для объединенных ячеек
+    columns: dict[str, str | tuple[str, int]]
+    numeric: tuple[str, ...]
+    # строки с пустым или нулевым значением ключа отбрасываются
+    key: str
+    sheet: str = field(default="Лист1")
+    # строк заголовка (вторая строка — подписи объединенных ячеек)
+    header_rows: int = field(default=1)
+
+
+CATALOGUES = {
+    "dpu": CatalogueSpec(
+        file="Параметры дизельных станций.xlsx",
+        columns={"name": "Марка генератора",
+                 "rated_active_power": "Pном (кВт)",
+                 "rated_apparent_power": "Sном (кВА)",
+                 "peak_active_power": "Pпик (кВт)",
+                 "number_of_phases": "К-во фаз",
+                 "rated_voltage": "U (кВ)",
+                 "spec_fuel_cons": "q (л/кВт*ч)"},
+        numeric=("rated_active_power", "rated_apparent_power", "peak_active_power",
+                 "number_of_phases", "rated_voltage", "spec_fuel_cons"),
+        key="rated_apparent_power"),
+    "bes": CatalogueSpec(
+        file="Параметры аккумуляторных батарей.xlsx",
+        columns={"name": "Тип литий-ионных аккумуляторов",
+                 "rated_voltage": "Uном, В",
+                 "rated_capacity": "Cном, Ah",
+                 "specific_energy": "Удельная энергия, Вт*ч/кг",
+                 "weight": "Масса, кг",
+                 "price": "Цена, руб",
+                 "length": ("Габариты, мм", 0),
+                 "width": ("Габариты, мм", 1),
+                 "height": ("Габариты, мм", 2)},
+        numeric=("rated_voltage", "rated_capacity", "weight", "price",
+                 "length", "width", "height"),
+        key="rated_capacity",
+        header_rows=2),
+    "pcs": CatalogueSpec(
+        file="Параметры аккумуляторных инверторов.xlsx",
+        columns={"name": "Тип",
+                 "rated_active_power": "Pном, кВт",
+                 "max_active_power": "Pmax, кВт",
+                 "peak_active_power": "Pпик, кВт",
+                 "input_voltage": "Uвх, В",
+                 "output_voltage": "Uвых, В",
+                 "max_capacity": "Cmax, Ah",
+                 "price": "Цена, руб"},
+        numeric=("rated_active_power", "max_active_power", "peak_active_power",
+                 "max_capacity", "price"),
+        key="rated_active_power"),
+}
+
+@dataclass
+class BadRow:
+    """Строка каталога с некорректным значением field (row — номер строки в Excel)."""
+    row: int
+    field: str
+    value: str
+    reason: str
+    # строка отброшена (некорректный ключ) или оставлена со значением NaN
+    dropped: bool
+
+
+@dataclass
+class IngestReport:
+    kind: str
+    path: str
+    rows: int = field(default=0)
+    kept: int = field(default=0)
+    bad_rows: list[BadRow] = field(default_factory=list)
+
+
+# колонки, уже прочитанные в этом процессе: kind -> (отпечаток файла, колонки)
+_COLUMNS: dict[str, tuple[tuple, dict[str, np.ndarray]]] = {}
+# отчеты о последнем чтении каталогов: kind -> IngestReport
+_REPORTS: dict[str, IngestReport] = {}
+
+
+def _fingerprint(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _maybe_number(value: str):
+    # "12" -> 12.0, "12/24" остается строкой, как в исходной таблице
+    try:
+        return float(value.replace(",", "."))
+    except ValueError:
+        return value
+
+
+def _to_number(value):
+    # как pd.to_numeric: числа и числовые строки; иначе None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _to_text(value) -> str:
+    # как pandas: целые числа из Excel без ".0", пустая ячейка — "nan"
+    if value is None:
+        return "nan"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+@instrumentation.timed("catalogue.read_excel")
+def read_columns(spec: CatalogueSpec, path: Path,
+                 report: IngestReport | None = None) -> dict[str, np.ndarray]:
+    """
+    Чтение книги Excel в колонки numpy (медленный путь, только при промахе кэша).
+    Строки читаются потоково (openpyxl, read_only) и проверяются по ходу
+    разбора: строки с пустым, нечисловым или нулевым ключом отбрасываются,
+    нечисловые значения остальных числовых полей заменяются на NaN; все
+    такие строки попадают в report.bad_rows.
+    """
+    from openpyxl import load_workbook
+
+    report = report if report is not None else IngestReport("", str(path))
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook[spec.sheet].iter_rows(values_only=True)
+        headers = list(next(rows))
+        for _ in range(spec.header_rows - 1):
+            next(rows)
+        index = {}
+        for name, header in spec.columns.items():
+            header, offset = header if isinstance(header, tuple) else (header, 0)
+            index[name] = headers.index(header) + offset
+        values = {name: [] for name in spec.columns}
+        for number, row in enumerate(rows, start=spec.header_rows + 1):
+            if not any(v is not None for v in row):
+                continue
+            report.rows += 1
+            cells = {name: row[i] if i < len(row) else None for name, i in index.items()}
+            key = _to_number(cells[spec.key])
+            if key is None or key != key or key == 0:
+                report.bad_rows.append(BadRow(number, spec.key, str(cells[spec.key]),
+                                              "пустое, нечисловое или нулевое значение ключа",
+                                              True))
+                continue
+            for name, value in cells.items():
+                if name in spec.numeric:
+                    number_value = _to_number(value)
+                    if number_value is None:
+                        if value is not None:
+                            report.bad_rows.append(BadRow(number, name, str(value),
+                                                          "нечисловое значение", False))
+                        number_value = float("nan")
+                    values[name].append(number_value)
+                else:
+                    values[name].append(_to_text(value))
+            report.kept += 1
+    finally:
+        workbook.close()
+    return {name: np.array(col, dtype=float if name in spec.numeric else str)
+            for name, col in values.items()}
+
+
+def load_columns(kind: str, data_dir: Path | None = None) -> dict[str, np.ndarray]:
+    """
+    Колонки каталога kind ("dpu", "bes", "pcs") из локального файла в data_dir.
+    Книга Excel разбирается один раз и сохраняется в кэш .npz вместе с отчетом
+    о некорректных строках; кэш сбрасывается, если у исходного файла изменились
+    время модификации/размер и содержимое.
+    """
+    spec = CATALOGUES[kind]
+    path = Path(data_dir or DATA_DIR) / spec.file
+    fingerprint = (str(path), *_fingerprint(path))
+    cached = _COLUMNS.get(kind)
+    if cached is not None and cached[0] == fingerprint:
+        instrumentation.count("catalogue.cache.memory")
+        return cached[1]
+
+    digest = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    cache_path = cache_dir() / f"{kind}-{digest}.npz"
+    columns = None
+    if cache_path.exists():
+        with np.load(cache_path, allow_pickle=False) as npz:
+            meta = npz["__meta__"].tolist()
+            touched = (int(meta[0]), int(meta[1])) != fingerprint[1:]
+            same = not touched or meta[2] == _file_hash(path)
+            if same and set(spec.columns) <= set(npz.files) and "__report__" in npz.files:
+                columns = {name: npz[name] for name in spec.columns}
+                report_json = str(npz["__report__"])
+                report = json.loads(report_json)
+                report["bad_rows"] = [BadRow(**row) for row in report["bad_rows"]]
+                _REPORTS[kind] = IngestReport(**report)
+                instrumentation.count("catalogue.cache.disk")
+        if columns is not None and touched:
+            # файл тронут, но не изменен: новый отпечаток, чтобы не хэшировать книгу снова
+            _write_cache(cache_path, [str(fingerprint[1]), str(fingerprint[2]), meta[2]],
+                         report_json, columns)
+    if columns is None:
+        instrumentation.count("catalogue.cache.miss")
+        report = IngestReport(kind, str(path))
+        columns = read_columns(spec, path, report)
+        _REPORTS[kind] = report
+        report_json = json.dumps({**vars(report),
+                                  "bad_rows": [vars(row) for row in report.bad_rows]},
+                                 ensure_ascii=False)
+        _write_cache(cache_path, [str(fingerprint[1]), str(fingerprint[2]), _file_hash(path)],
+                     report_json, columns)
+    _COLUMNS[kind] = (fingerprint, columns)
+    return columns
+
+
+def _write_cache(cache_path: Path, meta: list[str], report_json: str,
+                 columns: dict[str, np.ndarray]) -> None:
+    tmp = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, __meta__=np.array(meta), __report__=np.array(report_json), **columns)
+    os.replace(tmp, cache_path)
+
+
+def ingest_report(kind: str, data_dir: Path | None = None) -> IngestReport:
+    """Отчет о чтении каталога kind: число строк и некорректные строки."""
+    load_columns(kind, data_dir)
+    return _REPORTS[kind]
+
+
+def ingest_all(kinds=tuple(CATALOGUES), data_dir: Path | None = None,
+               workers: int | None = None) -> dict[str, IngestReport]:
+    """
+    Прочитать каталоги kinds одновременно на пуле потоков (книги независимы)
+    и вернуть отчеты о чтении; последующие *_base() берут колонки из памяти.
+    """
+    kinds = list(kinds)
+    if not kinds:
+        return {}
+    with ThreadPoolExecutor(workers or len(kinds)) as pool:
+        list(pool.map(lambda kind: load_columns(kind, data_dir), kinds))
+    return {kind: _REPORTS[kind] for kind in kinds}
+
+
+def dpu_base(data_dir: Path | None = None) -> list[DieselPowerUnit]:
+    c = load_columns("dpu", data_dir)
+    return [DieselPowerUnit(*row) for row in zip(
+        c["name"].tolist(), c["rated_active_power"].tolist(),
+        c["rated_apparent_power"].tolist(), c["peak_active_power"].tolist(),
+        c["number_of_phases"].astype(int).tolist(), c["rated_voltage"].tolist(),
+        c["spec_fuel_cons"].tolist())]
+
+
+def bes_base(data_dir: Path | None = None) -> list[BES]:
+    c = load_columns("bes", data_dir)
+    return [BES(name, voltage, capacity, energy, weight, price, tuple(geometry))
+            for name, voltage, capacity, energy, weight, price, *geometry in zip(
+                c["name"].tolist(), c["rated_voltage"].tolist(),
+                c["rated_capacity"].tolist(), c["specific_energy"].tolist(),
+                c["weight"].tolist(), c["price"].tolist(), c["length"].tolist(),
+                c["width"].tolist(), c["height"].tolist())]
+
+
+def pcs_base(data_dir: Path | None = None) -> list[PCS]:
+    c = load_columns("pcs", data_dir)
+    return [PCS(name, p_rated, p_max, p_peak, _maybe_number(u_in), _maybe_number(u_out),
+                c_max, price)
+            for name, p_rated, p_max, p_peak, u_in, u_out, c_max, price in zip(
+                c["name"].tolist(), c["rated_active_power"].tolist(),
+                c["max_active_power"].tolist(), c["peak_active_power"].tolist(),
+                c["input_voltage"].tolist(), c["output_voltage"].tolist(),
+                c["max_capacity"].tolist(), c["price"].tolist())]
+
+
+def catalogue_index(kind: str, key: str | None = None,
+                    data_dir: Path | None = None) -> CatalogueIndex:
+    """Каталог kind, отсортированный по key (по умолчанию — ключ спецификации)."""
+    base = {"dpu": dpu_base, "bes": bes_base, "pcs": pcs_base}[kind](data_dir)
+    return CatalogueIndex(base, key or CATALOGUES[kind].key)
@@ -0,0 +1,198 @@
+"""
+Пошаговая диспетчеризация: МГЭС -> АКБ -> ДЭС на 40–100 % своей мощности
+с зарядом АКБ избытком. Правила записаны один раз — в
+DispatchController.balance; по ним же идет почасовой цикл Dispatcher.run.
+
+DispatchController.step принимает одно измерение (нагрузка, мощность МГЭС)
+и пишет уставки в объект Setpoint, один на контроллер (его нужно прочитать
+или скопировать до следующего step). Все пределы считаются при создании, а
+самый экономичный состав ДЭУ для любой мощности — таблицей по интервалам
+мощности: шаг стоит O(log k) бинарного поиска по k границам интервалов
+(k растет как квадрат числа различимых составов) и не создает ни списков,
+ни кортежей; сами значения float в Python — по-прежнему объекты.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from Practise.Dispatcher.dispatch import Dispatcher
+
+
+class Setpoint:
+    """Уставки шага, кВт; fuel — л за шаг, soc — о.е. на конец шага."""
+    __slots__ = ("hpp", "bes", "dg", "dg_running", "fuel", "soc", "unserved", "spilled")
+
+    def __init__(self):
+        self.hpp = self.bes = self.dg = self.fuel = 0.0
+        self.soc = self.unserved = self.spilled = 0.0
+        self.dg_running = 0
+
+    def as_tuple(self) -> tuple:
+        return (self.hpp, self.bes, self.dg, self.dg_running, self.fuel,
+                self.soc, self.unserved, self.spilled)
+
+
+class DispatchController:
+    """
+    Состояние одного объекта: энергия банка АКБ и пределы оборудования из
+    Dispatcher (МГЭС, банк АКБ, ДЭС, ПСК). dt — длительность шага, ч
+    (1/3600 для посекундной телеметрии).
+    """
+    __slots__ = ("dt", "energy", "e", "e_min", "e_max", "p_lim", "eta_c", "eta_d",
+                 "caps", "floors", "dg_max", "options", "breaks", "at_break", "between",
+                 "setpoint")
+
+    def __init__(self, dispatcher: Dispatcher, dt: float = 1.0):
+        self.dt = dt
+        energy = dispatcher.bank_energy()
+        self.energy = energy
+        self.e_max = energy
+        self.e_min = energy * (1 - dispatcher.bes_bank.dod)
+        self.e = min(max(energy * dispatcher.soc0, self.e_min), self.e_max)
+        if dispatcher.pcs is not None:
+            self.p_lim = dispatcher.pcs.max_active_power * dispatcher.pcs_count
+            self.eta_d = dispatcher.pcs.efficiency
+        else:
+            self.p_lim, self.eta_d = float("inf"), 1.0
+        # заряд теряет и на ПСК, и в самих АКБ
+        self.eta_c = self.eta_d * dispatcher.bes_bank.efficiency
+        self.caps, self.floors = dispatcher.dg_limits()
+        self.dg_max = self.caps[-1] if self.caps else 0
+        # составы ДЭУ: (мощность, минимум, b, c, число ДЭУ), как в unit_commitment
+        self.options = []
+        if dispatcher.dg.units:
+            masks, cap, floor, b, c = dispatcher.dg.commitment_options()
+            self.options = list(zip(cap.tolist(), floor.tolist(), b.tolist(), c.tolist(),
+                                    masks.sum(axis=1).tolist()))
+        self._commitment_table()
+        self.setpoint = Setpoint()
+
+    def soc(self) -> float:
+        return self.e / self.energy if self.energy > 0 else 0.0
+
+    def _best_option(self, p_dg: float) -> tuple:
+        # DieselGenerator.unit_commitment(allow_excess=False) для одного значения:
+        # самый экономичный состав, в пределы которого попадает p_dg
+        best = None
+        best_fuel = float("inf")
+        for option in self.options:
+            cap, floor, b, c, _ = option
+            if floor <= p_dg <= cap:
+                x = p_dg / cap
+                fuel = b * x + c * x * x
+                if fuel < best_fuel:
+                    best, best_fuel = option, fuel
+        if best is None:
+            if p_dg > self.dg_max:
+                best = max(self.options, key=lambda o: o[0])
+            else:
+                best = min(self.options, key=lambda o: o[1])
+        return best
+
+    def _commitment_table(self) -> None:
+        """
+        Выбор состава ДЭУ меняется только на границах пределов составов и в
+        точках пересечения их кривых расхода b*p/cap + c*(p/cap)**2 (одна
+        ненулевая точка на пару). Состав считается по _best_option в каждой
+        границе (breaks, at_break) и в середине каждого интервала между ними
+        (between[i] — для мощностей между breaks[i - 1] и breaks[i]).
+        В нескольких ulp от пересечения кривых расход двух составов равен с
+        точностью до округления, и выбор может отличаться от _best_option.
+        """
+        points = set()
+        for cap, floor, b, c, _ in self.options:
+            points.update((cap, floor))
+        for i, (cap_i, _, b_i, c_i, _) in enumerate(self.options):
+            for cap_j, _, b_j, c_j, _ in self.options[i + 1:]:
+                quad = c_i / cap_i ** 2 - c_j / cap_j ** 2
+                if quad != 0:
+                    p = -(b_i / cap_i - b_j / cap_j) / quad
+                    if 0 < p < self.dg_max:
+                        points.add(p)
+        self.breaks = sorted(points)
+        self.at_break = [self._best_option(p) for p in self.breaks]
+        edges = [0.0] + self.breaks + [2 * self.breaks[-1] + 1] if self.breaks else []
+        self.between = [self._best_option((lo + hi) / 2) for lo, hi in zip(edges, edges[1:])]
+
+    def _commit(self, p_dg: float, sp: Setpoint) -> None:
+        pos = bisect_left(self.breaks, p_dg)
+        if pos < len(self.breaks) and self.breaks[pos] == p_dg:
+            cap, floor, b, c, running = self.at_break[pos]
+        else:
+            cap, floor, b, c, running = self.between[pos]
+        # вне пределов состава (ниже минимума или выше мощности) — как в unit_commitment
+        x = (p_dg if p_dg > floor else floor) / cap
+        if x > 1: x = 1.0
+        sp.fuel = (b * x + c * x * x) * self.dt
+        sp.dg_running = running
+
+    def balance(self, residual: float) -> None:
+        """
+        Один шаг правил по остатку нагрузки после МГЭС (нагрузка - мощность
+        МГЭС), кВт: в setpoint пишутся bes (> 0 — разряд), dg, unserved и
+        spilled, энергия банка self.e обновляется.
+        """
+        dt = self.dt
+        e = self.e
+        p_lim = self.p_lim
+        bes = dg = unserved = spilled = 0.0
+        if residual <= 0:
+            # избыток МГЭС — в АКБ, остаток сбрасывается
+            charge = (self.e_max - e) / (self.eta_c * dt)
+            if charge > p_lim: charge = p_lim
+            if charge > -residual: charge = -residual
+            e += charge * self.eta_c * dt
+            bes = -charge
+            spilled = -residual - charge
+        else:
+            eta_d = self.eta_d
+            available = (e - self.e_min) * eta_d / dt
+            if available > p_lim: available = p_lim
+            if available >= residual:
+                e -= residual / eta_d * dt
+                bes = residual
+            elif self.dg_max > 0:
+                if residual >= self.dg_max:
+                    dg = self.dg_max
+                else:
+                    dg = self.floors[bisect_left(self.caps, residual)]
+                    if residual > dg: dg = residual
+                if dg > residual:
+                    # ДЭС не опускается ниже 40 %: избыток — в АКБ
+                    excess = dg - residual
+                    charge = (self.e_max - e) / (self.eta_c * dt)
+                    if charge > p_lim: charge = p_lim
+                    if charge > excess: charge = excess
+                    e += charge * self.eta_c * dt
+                    bes = -charge
+                    spilled = excess - charge
+                else:
+                    discharge = residual - dg
+                    if discharge > available: discharge = available
+                    e -= discharge / eta_d * dt
+                    bes = discharge
+                    unserved = residual - dg - discharge
+            else:
+                e -= available / eta_d * dt
+                bes = available
+                unserved = residual - available
+        self.e = e
+        sp = self.setpoint
+        sp.bes = bes
+        sp.dg = dg
+        sp.unserved = unserved
+        sp.spilled = spilled
+
+    def step(self, load: float, hydro: float) -> Setpoint:
+        """Уставки на шаг по измеренным нагрузке и располагаемой мощности МГЭС, кВт."""
+        sp = self.setpoint
+        self.balance(load - hydro)
+        sp.hpp = hydro
+        sp.soc = self.e / self.energy if self.energy > 0 else 0.0
+        if sp.dg > 0:
+            self._commit(sp.dg, sp)
+        else:
+            sp.fuel = 0.0
+            sp.dg_running = 0
+        return sp
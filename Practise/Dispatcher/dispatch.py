@@ -0,0 +1,123 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant
+from Practise.Generators.Diesel.DieselGenerator import DieselGenerator
+from Practise.Storage.BESbank import BESbank
+from Practise.Invertors.PCS import PCS
+from Practise.Dispatcher.controller import DispatchController
+from Practise.instrumentation import timed
+
+
+@dataclass
+class DispatchResult:
+    """Почасовые результаты диспетчеризации, кВт (кВт·ч за час) и л."""
+    load: np.ndarray
+    hpp: np.ndarray       # располагаемая мощность МГЭС
+    bes: np.ndarray       # > 0 — разряд АКБ, < 0 — заряд
+    dg: np.ndarray        # выработка ДЭС
+    soc: np.ndarray       # степень заряженности банка АКБ на конец часа, о.е.
+    fuel: np.ndarray      # расход топлива ДЭС
+    unserved: np.ndarray  # непокрытая нагрузка
+    spilled: np.ndarray   # избыток МГЭС/ДЭС, который некуда деть
+    dg_units: np.ndarray  # загрузка каждой ДЭУ (часы x units)
+    # баланс по каждому часу: load = hpp + dg + bes - spilled + unserved
+
+    def total_fuel(self) -> float:
+        return float(self.fuel.sum())
+
+    def total_unserved(self) -> float:
+        return float(self.unserved.sum())
+
+    def total_spilled(self) -> float:
+        return float(self.spilled.sum())
+
+
+@dataclass
+class Dispatcher:
+    """
+    Почасовая диспетчеризация микросети по алгоритму из README:
+    МГЭС -> АКБ -> ДЭС на 40–100 % своей мощности с зарядом АКБ избытком.
+    Число работающих ДЭУ выбирается по часам (DieselGenerator.unit_commitment).
+    """
+    hpp: HydroPowerPlant
+    bes_bank: BESbank
+    dg: DieselGenerator
+    pcs: Optional[PCS] = None
+    pcs_count: int = field(default=1)
+    # номинальная энергия банка АКБ, кВт·ч; по умолчанию — по units банка
+    bes_energy: Optional[float] = None
+    soc0: float = field(default=1.0)
+
+    def bank_energy(self) -> float:
+        if self.bes_energy is not None:
+            return self.bes_energy
+        return sum(u.rated_voltage * u.rated_capacity for u in self.bes_bank.units) / 1000
+
+    def dg_limits(self) -> tuple[list[float], list[float]]:
+        """
+        Мощности составов ДЭУ по возрастанию и наименьший минимум загрузки
+        среди составов не меньшей мощности: ДЭС на нагрузку r работает не ниже
+        floors[bisect_left(caps, r)].
+        """
+        if not self.dg.units:
+            return [], []
+        _, cap, floor, _, _ = self.dg.commitment_options()
+        order = np.argsort(cap)
+        floors = np.minimum.accumulate(floor[order][::-1])[::-1]
+        return cap[order].tolist(), floors.tolist()
+
+    @timed("Dispatcher.run")
+    def run(self, hourly_demand, hydro=None) -> DispatchResult:
+        """
+        hourly_demand — HourlyDemand (годовой ряд) или массив нагрузки по часам;
+        hydro — располагаемая мощность МГЭС по часам (по умолчанию — из
+        HydroPowerPlant.hourly_power с начала ряда).
+        """
+        if isinstance(hourly_demand, HourlyDemand):
+            load = hourly_demand.year_array()
+        else:
+            load = np.asarray(hourly_demand, dtype=float)
+        n = len(load)
+        if hydro is None:
+            hydro = self.hpp.hourly_power(0, n)
+        else:
+            hydro = np.broadcast_to(np.asarray(hydro, dtype=float), (n,))
+
+        # правила шага — в DispatchController.balance (общие с пошаговой диспетчеризацией)
+        controller = DispatchController(self)
+        balance = controller.balance
+        sp = controller.setpoint
+        bes_out = [0.0] * n
+        dg_out = [0.0] * n
+        e_out = [0.0] * n
+        unserved = [0.0] * n
+        spilled = [0.0] * n
+        # python-цикл по простым float: состояние АКБ зависит от предыдущего часа
+        for t, residual in enumerate((load - hydro).tolist()):
+            balance(residual)
+            bes_out[t] = sp.bes
+            dg_out[t] = sp.dg
+            unserved[t] = sp.unserved
+            spilled[t] = sp.spilled
+            e_out[t] = controller.e
+
+        bes = np.array(bes_out)
+        dg = np.array(dg_out)
+        # состав ДЭУ по часам: минимум уже учтен в dg, лишней выработки не допускается
+        schedule = self.dg.unit_commitment(dg, allow_excess=False)
+        return DispatchResult(
+            load=load,
+            hpp=hydro.copy(),
+            bes=bes,
+            dg=dg,
+            soc=np.array(e_out) / controller.energy if controller.energy > 0 else np.zeros(n),
+            fuel=schedule.fuel,
+            unserved=np.array(unserved),
+            spilled=np.array(spilled),
+            dg_units=schedule.unit_power,
+        )
@@ -0,0 +1,188 @@
+"""
+Асинхронный прием телеметрии для DispatchController.
+
+Измерение — строка "объект,нагрузка,мощность МГЭС" (кВт, UTF-8). Источники
+отдают строки пачками, чтобы накладные расходы asyncio приходились на пачку,
+а не на каждое измерение:
+
+    replay_file — воспроизведение файла (с темпом rate измерений в секунду
+                  или без пауз);
+    read_socket — строки из TCP-соединения;
+    serve       — TCP-сервер, принимающий телеметрию от нескольких источников.
+
+    python -m Practise.Dispatcher.live --replay telemetry.csv --rate 1000
+    python -m Practise.Dispatcher.live --listen 127.0.0.1:9000
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Optional
+import argparse
+import asyncio
+import time
+
+from Practise.Dispatcher.controller import DispatchController, Setpoint
+
+# размер пачки строк при чтении файла, байт
+READ_BLOCK = 1 << 16
+
+
+@dataclass
+class FeedStats:
+    steps: int = field(default=0)
+    bad_lines: int = field(default=0)
+    errors: int = field(default=0)
+    seconds: float = field(default=0.0)
+
+    def rate(self) -> float:
+        """Измерений в секунду."""
+        return self.steps / self.seconds if self.seconds > 0 else 0.0
+
+
+async def replay_file(path, rate: Optional[float] = None) -> AsyncIterator[list[bytes]]:
+    """Строки файла пачками; rate — темп воспроизведения, измерений в секунду."""
+    with open(path, "rb") as f:
+        while True:
+            lines = f.readlines(READ_BLOCK)
+            if not lines:
+                break
+            yield lines
+            # отдать управление другим задачам (и выдержать темп, если он задан)
+            await asyncio.sleep(len(lines) / rate if rate else 0)
+
+
+async def _stream_lines(reader: asyncio.StreamReader) -> AsyncIterator[list[bytes]]:
+    tail = b""
+    while True:
+        data = await reader.read(READ_BLOCK)
+        if not data:
+            break
+        lines = (tail + data).split(b"\n")
+        tail = lines.pop()
+        if lines:
+            yield lines
+    if tail:
+        yield [tail]
+
+
+async def read_socket(host: str, port: int) -> AsyncIterator[list[bytes]]:
+    """Строки из TCP-соединения с источником телеметрии."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        async for lines in _stream_lines(reader):
+            yield lines
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def _controller_lookup(controllers) -> Callable[[str], DispatchController]:
+    # controllers — словарь {объект: контроллер} или фабрика контроллера по имени
+    if callable(controllers):
+        cache: dict[str, DispatchController] = {}
+
+        def lookup(site):
+            ctl = cache.get(site)
+            if ctl is None:
+                ctl = cache[site] = controllers(site)
+            return ctl
+        return lookup
+    return controllers.__getitem__
+
+
+async def run_feed(source: AsyncIterator[list[bytes]], controllers,
+                   on_setpoint: Optional[Callable[[str, Setpoint], None]] = None,
+                   stats: Optional[FeedStats] = None) -> FeedStats:
+    """
+    Измерения источника -> DispatchController.step -> on_setpoint(объект, уставки).
+    Некорректные строки и неизвестные объекты считаются в stats.bad_lines,
+    исключения фабрики контроллеров и самих контроллеров — в stats.errors:
+    поток остальных объектов не прерывается.
+    """
+    stats = stats if stats is not None else FeedStats()
+    lookup = _controller_lookup(controllers)
+    start = time.perf_counter()
+    steps = 0
+    async for lines in source:
+        for line in lines:
+            try:
+                site, load, hydro = line.split(b",")
+                site = site.decode()
+                load, hydro = float(load), float(hydro)
+            except ValueError:
+                if line.strip():
+                    stats.bad_lines += 1
+                continue
+            try:
+                setpoint = lookup(site).step(load, hydro)
+            except KeyError:
+                stats.bad_lines += 1
+                continue
+            except Exception:
+                stats.errors += 1
+                continue
+            steps += 1
+            if on_setpoint is not None:
+                on_setpoint(site, setpoint)
+    stats.steps += steps
+    stats.seconds += time.perf_counter() - start
+    return stats
+
+
+async def serve(host: str, port: int, controllers,
+                on_setpoint: Optional[Callable[[str, Setpoint], None]] = None,
+                stats: Optional[FeedStats] = None) -> asyncio.AbstractServer:
+    """TCP-сервер: каждое входящее соединение — отдельный источник телеметрии."""
+    stats = stats if stats is not None else FeedStats()
+    lookup = _controller_lookup(controllers)
+
+    async def handle(reader, writer):
+        try:
+            await run_feed(_stream_lines(reader), lookup, on_setpoint, stats)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    return await asyncio.start_server(handle, host, port)
+
+
+def demo_controller(dt: float, bes_energy: float) -> Callable[[str], DispatchController]:
+    """Фабрика контроллеров с оборудованием демонстрационного объекта (cli/demo.py)."""
+    from Practise.Dispatcher.dispatch import Dispatcher
+    from Practise.Storage.BESbank import BESbank
+    from Practise.cli import demo
+
+    dg = demo.assembly_dg("ДЭС", "2x50")
+    hpp = demo.build_hpp()
+    return lambda site: DispatchController(
+        Dispatcher(hpp, BESbank(), dg, bes_energy=bes_energy), dt)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Диспетчеризация по потоку телеметрии")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--replay", help="файл строк 'объект,нагрузка,мощность МГЭС'")
+    source.add_argument("--listen", help="адрес host:port TCP-сервера телеметрии")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="темп воспроизведения файла, измерений/с (по умолчанию без пауз)")
+    parser.add_argument("--dt", type=float, default=1 / 3600, help="шаг телеметрии, ч")
+    parser.add_argument("--bes-energy", type=float, default=300, help="энергия банка АКБ, кВт·ч")
+    args = parser.parse_args(argv)
+
+    factory = demo_controller(args.dt, args.bes_energy)
+    if args.replay:
+        stats = asyncio.run(run_feed(replay_file(args.replay, args.rate), factory))
+        print(f"Измерений: {stats.steps}, некорректных строк: {stats.bad_lines}, "
+              f"ошибок: {stats.errors}, {stats.rate():.0f} изм./с")
+        return 0
+
+    host, port = args.listen.rsplit(":", 1)
+
+    async def listen():
+        server = await serve(host, int(port), factory)
+        async with server:
+            await server.serve_forever()
+    asyncio.run(listen())
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+import os
+
+import numpy as np
+
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+from Practise.Storage.BESbank import daily_surplus_energy
+from Practise.Dispatcher.dispatch import Dispatcher
+
+
+@dataclass
+class Uncertainty:
+    """СКО случайных отклонений исходных данных, о.е."""
+    load: float = field(default=0.1)         # уровень нагрузки (один на выборку)
+    season: float = field(default=0.05)      # коэффициенты сезонности (по месяцам)
+    hydro_month: float = field(default=0.15) # водность МГЭС по месяцам
+    hydro: float = field(default=0.05)       # почасовые колебания мощности МГЭС
+
+
+@dataclass
+class MonteCarloResult:
+    """Показатели по выборкам: емкость банка АКБ, топливо ДЭС, недоотпуск."""
+    capacity: np.ndarray
+    fuel: np.ndarray
+    deficit: np.ndarray
+
+    def percentiles(self, q=(50, 90, 99)) -> dict[str, dict[str, float]]:
+        """Таблица {показатель: {"P50": ..., "P90": ..., "P99": ...}}."""
+        table = {}
+        for name in ("capacity", "fuel", "deficit"):
+            values = np.percentile(getattr(self, name), q)
+            table[name] = {f"P{p:g}": float(v) for p, v in zip(q, values)}
+        return table
+
+
+def sample(hourly_demand: HourlyDemand, dispatcher: Dispatcher,
+           uncertainty: Uncertainty, seed: int, index: int) -> tuple[float, float, float]:
+    """
+    Одна выборка: возмущенные нагрузка, сезонность и почасовая мощность МГЭС
+    (относительно ее ряда availability, если он задан).
+    Случайный поток выборки задается только (seed, index) и не зависит от
+    того, в каком процессе и в каком порядке она считается.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    months = hourly_demand.get_days_in_month()
+    days = np.fromiter(months.values(), dtype=np.intp, count=len(months))
+
+    total = hourly_demand.total_active_lp * max(1 + uncertainty.load * rng.standard_normal(), 0)
+    season = rng.standard_normal(len(months))
+    season_factors = {m: hourly_demand.season_factors[m] * max(1 + uncertainty.season * z, 0)
+                      for m, z in zip(months, season)}
+    demand = HourlyDemand(total, hourly_demand.daily_load_schedule, season_factors).days_array()
+
+    water = np.repeat(1 + uncertainty.hydro_month * rng.standard_normal(len(months)), days)
+    hydro = water[:, None] + uncertainty.hydro * rng.standard_normal(demand.shape)
+    hpp = dispatcher.hpp
+    # при многолетнем ряде МГЭС — случайный год ряда
+    year = int(rng.integers(hpp.years())) if hpp.years() > 1 else 0
+    hydro = hpp.year_power(year) * np.clip(hydro, 0, 1)
+
+    capacity = dispatcher.bes_bank.capacity_for_energy(
+        float(daily_surplus_energy(demand, hydro).max()))
+    result = dispatcher.run(demand.ravel(), hydro.ravel())
+    return capacity, result.total_fuel(), result.total_unserved()
+
+
+_CONTEXT: dict = {}
+
+
+def _init_worker(context: dict) -> None:
+    _CONTEXT.clear()
+    _CONTEXT.update(context)
+
+
+def _run_chunk(indices: range) -> list[tuple[float, float, float]]:
+    ctx = _CONTEXT
+    return [sample(ctx["hourly_demand"], ctx["dispatcher"], ctx["uncertainty"],
+                   ctx["seed"], i) for i in indices]
+
+
+def monte_carlo(hourly_demand: HourlyDemand, dispatcher: Dispatcher, n_samples: int,
+                seed: int = 0, uncertainty: Optional[Uncertainty] = None,
+                workers: Optional[int] = None) -> MonteCarloResult:
+    """
+    Метод Монте-Карло для требуемой емкости банка АКБ (как BESbank.total_capacity),
+    годового расхода топлива и недоотпуска при заданном составе оборудования.
+    Выборки распределяются по пулу процессов; результат воспроизводим при том же seed
+    независимо от числа процессов.
+    """
+    context = {"hourly_demand": hourly_demand, "dispatcher": dispatcher,
+               "uncertainty": uncertainty or Uncertainty(), "seed": seed}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(context)
+        rows = _run_chunk(range(n_samples))
+    else:
+        size = max(1, n_samples // (workers * 4))
+        chunks = [range(i, min(i + size, n_samples)) for i in range(0, n_samples, size)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(context,)) as pool:
+            rows = [row for chunk in pool.map(_run_chunk, chunks) for row in chunk]
+
+    capacity, fuel, deficit = np.array(rows, dtype=float).reshape(-1, 3).T
+    return MonteCarloResult(capacity, fuel, deficit)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Optional
+import math
+import os
+
+import numpy as np
+
+from Practise.Generators.Diesel.DieselGenerator import DieselGenerator
+from Practise.Storage.BESbank import BESbank
+from Practise.Dispatcher.dispatch import Dispatcher
+from Practise.Catalogue.CatalogueIndex import CatalogueIndex
+
+
+@dataclass
+class SweepCandidate:
+    """Вариант состава оборудования и его показатели за год."""
+    assembly_type: str
+    bes_name: str
+    pcs_name: str
+    number_of_bes: int = field(default=0)
+    pcs_count: int = field(default=0)
+    dg_rated_apparent_power: float = field(default=0)
+    fuel: float = field(default=0)       # л/год
+    capex: float = field(default=0)      # руб
+    unserved: float = field(default=0)   # кВт·ч/год
+    rank: int = field(default=0)         # 0 — фронт Парето
+
+    def objectives(self) -> tuple[float, float, float]:
+        return self.fuel, self.capex, self.unserved
+
+
+def assembly_patterns(max_units: int = 4, step: int = 10) -> list[str]:
+    """
+    Все компоновки ДЭС, которые принимает DieselGenerator.auto_assembly_dg:
+    "NxM" и "NxM+K" с n*M + K = 100, K кратно step.
+    """
+    patterns = []
+    for n in range(1, max_units + 1):
+        for k in range(0, 100, step):
+            if (100 - k) % n:
+                continue
+            m = (100 - k) // n
+            patterns.append(f"{n}x{m}+{k}" if k else f"{n}x{m}")
+    return patterns
+
+
+def _dominates(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Матрица (len(a), len(b)): a[i] не хуже b[j] по всем критериям и лучше хотя бы по одному."""
+    not_worse = np.ones((len(a), len(b)), dtype=bool)
+    better = np.zeros((len(a), len(b)), dtype=bool)
+    for k in range(a.shape[1]):
+        x, y = a[:, k, None], b[None, :, k]
+        not_worse &= x <= y
+        better |= x < y
+    return not_worse & better
+
+
+def pareto_ranks(objectives, block: int = 256) -> np.ndarray:
+    """
+    Ранги недоминируемой сортировки (0 — фронт Парето), все критерии минимизируются.
+    Ранг варианта — длина наибольшей цепочки доминирующих его вариантов. После
+    лексикографической сортировки доминировать могут только предыдущие, поэтому
+    ранги считаются блоками по block вариантов матрицами доминирования numpy.
+    """
+    obj = np.asarray(objectives, dtype=float)
+    n = len(obj)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    order = np.lexsort(obj.T[::-1])
+    obj = obj[order]
+    ranks = np.zeros(n, dtype=int)
+    for start in range(0, n, block):
+        current = obj[start:start + block]
+        # наибольший ранг среди доминирующих из предыдущих блоков (-1 — таких нет)
+        base = np.full(len(current), -1)
+        for prev in range(0, start, 16 * block):
+            stop = min(prev + 16 * block, start)
+            dominated = _dominates(obj[prev:stop], current)
+            # (ранг + 1) доминирующих, 0 у остальных
+            base = np.maximum(base, (dominated * (ranks[prev:stop, None] + 1)).max(axis=0) - 1)
+        # внутри блока ранги уточняются до неподвижной точки (не дольше длины цепочки)
+        inner = _dominates(current, current)
+        rank = base + 1
+        while True:
+            updated = np.maximum(base, (inner * (rank[:, None] + 1)).max(axis=0) - 1) + 1
+            if np.array_equal(updated, rank):
+                break
+            rank = updated
+        ranks[start:start + block] = rank
+    result = np.empty(n, dtype=int)
+    result[order] = ranks
+    return result
+
+
+# контекст рабочего процесса: передается один раз через initializer
+_CONTEXT: dict = {}
+
+
+def _init_worker(context: dict) -> None:
+    _CONTEXT.clear()
+    _CONTEXT.update(context)
+
+
+def _evaluate(candidate: tuple[str, int, int]) -> SweepCandidate:
+    assembly_type, i_bes, i_pcs = candidate
+    ctx = _CONTEXT
+    hd, hpp = ctx["hourly_demand"], ctx["hpp"]
+    bes, pcs = ctx["bes_base"][i_bes], ctx["pcs_base"][i_pcs]
+
+    dg = ctx["dg_assemblies"][assembly_type]
+
+    bank = BESbank(dod=ctx["dod"], efficiency=ctx["efficiency"])
+    # total_capacity считается в кА·ч, поэтому емкость АКБ переводится из А·ч
+    number_of_bes = math.ceil(bank.number_of_bes(hd, hpp, bes.rated_capacity / 1000,
+                                                 bes.rated_voltage))
+    bank_capacity = number_of_bes * bes.rated_capacity
+    pcs_count = max(1,
+                    math.ceil(ctx["peak_power"] / pcs.max_active_power),
+                    math.ceil(bank_capacity / pcs.max_capacity))
+
+    result = Dispatcher(hpp, bank, dg, pcs, pcs_count=pcs_count,
+                        bes_energy=number_of_bes * bes.rated_voltage * bes.rated_capacity / 1000
+                        ).run(hd)
+    return SweepCandidate(
+        assembly_type=assembly_type,
+        bes_name=bes.name,
+        pcs_name=pcs.name,
+        number_of_bes=number_of_bes,
+        pcs_count=pcs_count,
+        dg_rated_apparent_power=dg.rated_apparent_power,
+        fuel=result.total_fuel(),
+        capex=number_of_bes * bes.price + pcs_count * pcs.price
+              + ctx["dg_price"] * dg.rated_apparent_power,
+        unserved=result.total_unserved(),
+    )
+
+
+def assemble_dg(patterns: list[str], dpu_base, total_apparent_lp: float
+                ) -> dict[str, DieselGenerator]:
+    """
+    ДЭС по каждой компоновке; компоновки, для которых в каталоге нет ДЭУ
+    нужной мощности, пропускаются. Зависит только от нагрузки и каталога,
+    поэтому считается один раз на объект, а не для каждого варианта АКБ и ПСК.
+    """
+    assemblies = {}
+    for assembly_type in patterns:
+        dg = DieselGenerator(assembly_type, assembly_type)
+        dg.auto_assembly_dg(dpu_base, total_apparent_lp)
+        if dg.rated_apparent_power >= total_apparent_lp * (1 - 1e-9):
+            assemblies[assembly_type] = dg
+    return assemblies
+
+
+def sweep(hourly_demand, hpp, dpu_base, bes_base, pcs_base, total_apparent_lp,
+          patterns: Optional[list[str]] = None, bes_bank: Optional[BESbank] = None,
+          dg_price: float = 0, workers: Optional[int] = None) -> list[SweepCandidate]:
+    """
+    Перебор всех сочетаний компоновки ДЭС, типа АКБ и модели ПСК на пуле процессов.
+    Для каждого варианта — годовой расход топлива, капзатраты и недоотпуск.
+    dg_price — удельная стоимость ДЭС, руб/кВА (в каталоге ДЭУ цен нет).
+    Возвращает варианты, упорядоченные по рангу Парето и расходу топлива.
+    """
+    patterns = patterns if patterns is not None else assembly_patterns()
+    bes_bank = bes_bank or BESbank()
+    load = np.asarray(hourly_demand())
+    dpu_base = CatalogueIndex.of(dpu_base, "rated_apparent_power")
+    dg_assemblies = assemble_dg(patterns, dpu_base, total_apparent_lp)
+    context = {
+        "hourly_demand": hourly_demand,
+        "hpp": hpp,
+        "dg_assemblies": dg_assemblies,
+        "bes_base": bes_base,
+        "pcs_base": pcs_base,
+        "total_apparent_lp": total_apparent_lp,
+        "dod": bes_bank.dod,
+        "efficiency": bes_bank.efficiency,
+        "dg_price": dg_price,
+        # ПСК должны пропускать и наибольший избыток МГЭС, и наибольший дефицит
+        "peak_power": float(np.abs(load - hpp.hourly_power(0, len(load))).max()),
+    }
+    candidates = list(product(dg_assemblies, range(len(bes_base)), range(len(pcs_base))))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(context)
+        results = list(map(_evaluate, candidates))
+    else:
+        chunksize = max(1, len(candidates) // (workers * 8))
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(context,)) as pool:
+            results = list(pool.map(_evaluate, candidates, chunksize=chunksize))
+
+    if not results:
+        return results
+    for r, rank in zip(results, pareto_ranks([r.objectives() for r in results])):
+        r.rank = int(rank)
+    results.sort(key=lambda r: (r.rank, r.fuel, r.capex, r.unserved))
+    return results
+
+
+def pareto_front(results: list[SweepCandidate]) -> list[SweepCandidate]:
+    return [r for r in results if r.rank == 0]
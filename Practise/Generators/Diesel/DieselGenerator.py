@@ -1,7 +1,24 @@
 from dataclasses import dataclass, field
+from itertools import product
 from Practise.Generators.Diesel.DieselPowerUnit import DieselPowerUnit
+from Practise.Catalogue.CatalogueIndex import CatalogueIndex
+from Practise.instrumentation import timed
 import re
-import pandas as pd
+import numpy as np
+
+
+@dataclass
+class DGSchedule:
+    """Почасовой состав и загрузка ДЭУ, кВт и л."""
+    n_running: np.ndarray   # число работающих ДЭУ
+    unit_power: np.ndarray  # загрузка каждой ДЭУ (часы x units)
+    power: np.ndarray       # выработка ДЭС
+    fuel: np.ndarray        # расход топлива
+    deficit: np.ndarray     # нагрузка сверх установленной мощности
+    excess: np.ndarray      # выработка сверх нагрузки из-за минимума 40 %
+
+    def total_fuel_cons(self) -> float:
+        return float(self.fuel.sum())
 
 
 @dataclass
@@ -16,6 +33,82 @@ class DieselGenerator:
                               unit.active_power for unit in self.units)
         return total_fuel_cons
 
+    def commitment_options(self):
+        """
+        Все различимые составы работающих ДЭУ (одинаковые ДЭУ взаимозаменяемы).
+        Возвращает маски работающих units (варианты x units) и по каждому варианту
+        мощность, минимум загрузки и коэффициенты расхода fuel = b*x + c*x**2,
+        где x — доля загрузки, одинаковая для всех работающих ДЭУ.
+        """
+        groups: dict[tuple, list[int]] = {}
+        for i, u in enumerate(self.units):
+            key = (u.rated_active_power, u.min_active_power, u.spec_fuel_cons, u.coeff_fc)
+            groups.setdefault(key, []).append(i)
+        masks = []
+        for counts in product(*(range(len(g) + 1) for g in groups.values())):
+            mask = np.zeros(len(self.units), dtype=bool)
+            for k, g in zip(counts, groups.values()):
+                mask[g[:k]] = True
+            if mask.any():
+                masks.append(mask)
+        masks = np.array(masks).reshape(-1, len(self.units))
+
+        rated = np.array([u.rated_active_power for u in self.units], dtype=float)
+        minimum = np.array([u.min_active_power for u in self.units], dtype=float)
+        q = np.array([u.spec_fuel_cons * u.rated_active_power for u in self.units], dtype=float)
+        c = np.array([u.coeff_fc for u in self.units], dtype=float)
+        return masks, masks @ rated, masks @ minimum, masks @ (c * q), masks @ ((1 - c) * q)
+
+    @timed("DieselGenerator.unit_commitment")
+    def unit_commitment(self, residual_load, allow_excess: bool = True) -> DGSchedule:
+        """
+        Почасовой выбор работающих ДЭУ для ряда остаточной нагрузки: из составов,
+        покрывающих нагрузку, берется самый экономичный по топливу; нагрузка
+        делится между работающими ДЭУ пропорционально их мощности, ни одна ДЭУ
+        не загружается ниже min_active_power. allow_excess=False запрещает составы,
+        минимум которых выше нагрузки, если есть другие.
+        """
+        load = np.asarray(residual_load, dtype=float)
+        shape = load.shape
+        load = load.ravel()
+        hours = np.arange(len(load))
+        if not self.units:
+            zeros = np.zeros(len(load))
+            return DGSchedule(np.zeros(len(load), dtype=int), np.zeros((len(load), 0)),
+                              zeros, zeros, np.maximum(load, 0), zeros)
+
+        masks, cap, floor, b, c = self.commitment_options()
+        target = np.maximum(load, floor[:, None])
+        feasible = cap[:, None] >= load
+        if not allow_excess:
+            feasible &= floor[:, None] <= load
+        x = target / cap[:, None]
+        fuel = b[:, None] * x + c[:, None] * x * x
+        fuel[~feasible] = np.inf
+        best = fuel.argmin(axis=0)
+
+        # нагрузка больше установленной мощности — все ДЭУ на 100 %
+        over = load > cap.max()
+        best[over] = cap.argmax()
+        # нагрузка ниже минимума всех подходящих составов — наименьший минимум
+        under = ~over & ~feasible.any(axis=0)
+        best[under] = floor.argmin()
+        idle = load <= 0
+
+        share = np.where(idle, 0, np.minimum(x[best, hours], 1))
+        power = share * cap[best]
+        rated = np.array([u.rated_active_power for u in self.units], dtype=float)
+        unit_power = masks[best] * rated * share[:, None]
+        return DGSchedule(
+            n_running=np.where(idle, 0, masks[best].sum(axis=1)).reshape(shape),
+            unit_power=unit_power.reshape(*shape, len(self.units)),
+            power=power.reshape(shape),
+            fuel=(b[best] * share + c[best] * share ** 2).reshape(shape),
+            deficit=np.maximum(load - power, 0).reshape(shape),
+            excess=np.maximum(power - np.maximum(load, 0), 0).reshape(shape),
+        )
+
+    @timed("DieselGenerator.auto_assembly_dg")
     def auto_assembly_dg(self, dpu_base, total_apparent_lp):
         m = re.fullmatch(r"(\d+)x(\d+)(?:\+(\d+))?", self.assembly_type.strip())
         if not m:
@@ -28,20 +121,24 @@ class DieselGenerator:
         if n*M + K != 100:
             raise ValueError(f"Суммарный процентаж ДЭС должнен быть 100, а получен {n*M + K}")
 
-        for dpu in dpu_base:
-            if dpu.rated_apparent_power >= total_apparent_lp * M/100:
-                self.units.extend(n*[dpu])
-                break
+        # наименьшие по мощности подходящие ДЭУ, независимо от порядка в базе;
+        # индекс списка строится один раз на список, а не при каждом вызове
+        dpu_base = CatalogueIndex.of(dpu_base, "rated_apparent_power")
+
+        dpu = dpu_base.smallest_at_least(total_apparent_lp * M/100)
+        if dpu is not None:
+            self.units.extend(n*[dpu])
 
         if K != 0:
-            for dpu in dpu_base:
-                if dpu.rated_apparent_power >= total_apparent_lp * K / 100:
-                    self.units.append(dpu)
-                    break
+            dpu = dpu_base.smallest_at_least(total_apparent_lp * K / 100)
+            if dpu is not None:
+                self.units.append(dpu)
 
         self.rated_apparent_power = sum(u.rated_apparent_power for u in self.units)
 
     def show_table(self):
+        import pandas as pd
+
         # создаём список словарей для DataFrame
         rows = []
         for i, u in enumerate(self.units, start=1):
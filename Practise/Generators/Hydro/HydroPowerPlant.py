@@ -1,15 +1,169 @@
+from __future__ import annotations
 from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+import hashlib
+import os
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+# кВт на (м3/с · м) при плотности воды 1000 кг/м3
+_G = 9.81
 
 
 @dataclass
 class HydroPowerPlant:
+    """
+    МГЭС. Без ряда availability располагаемая мощность всегда номинальная.
+    availability — ряд по интервалам (steps_per_hour на час), в единицах
+    ряда: доли номинальной мощности или расход воды, м3/с; мощность равна
+    min(availability * availability_scale, rated_active_power). Ряд может
+    быть np.memmap многолетних данных: из него читаются только нужные годы.
+    Год ряда — 8760 часов, как у HourlyDemand.
+    """
     name: str
     rated_active_power: float
     rated_apparent_power: float = field(init=False)
     rated_voltage: float = field(default=0.4)
     active_power: float = field(init=False)
+    availability: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    # кВт на единицу ряда; по умолчанию ряд — в долях номинальной мощности
+    availability_scale: Optional[float] = field(default=None)
+    steps_per_hour: int = field(default=1)
+    # (путь, dtype, mtime, размер) файла, из которого отображен ряд
+    _source: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # хэш ряда в памяти для cache_key: считается один раз, сбрасывается при замене ряда
+    _digest: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self.active_power = self.rated_active_power
         # в данной задаче мощности активная и полная равны
-        self.rated_apparent_power = self.rated_active_power
\ No newline at end of file
+        self.rated_apparent_power = self.rated_active_power
+        if self.availability_scale is None:
+            self.availability_scale = self.rated_active_power
+        if self.availability is not None and self.years() < 1:
+            raise ValueError(f"Ряд располагаемой мощности МГЭС {self.name} короче года: "
+                             f"{len(self.availability)} значений при "
+                             f"{HOURS_PER_YEAR * self.steps_per_hour} на год")
+
+    def __setattr__(self, name, value):
+        if name == "availability":
+            object.__setattr__(self, "_digest", None)
+        object.__setattr__(self, name, value)
+
+    # ---------- конструкторы ----------
+    @classmethod
+    def from_capacity_factor(cls, name, rated_active_power, capacity_factor,
+                             steps_per_hour=1, **kwargs) -> HydroPowerPlant:
+        """Ряд коэффициентов использования мощности, о.е."""
+        return cls(name, rated_active_power, availability=capacity_factor,
+                   steps_per_hour=steps_per_hour, **kwargs)
+
+    @classmethod
+    def from_flow(cls, name, rated_active_power, flow, head, efficiency=0.85,
+                  steps_per_hour=1, **kwargs) -> HydroPowerPlant:
+        """Ряд расхода воды, м3/с, при напоре head, м, и КПД агрегатов efficiency."""
+        return cls(name, rated_active_power, availability=flow,
+                   availability_scale=_G * head * efficiency,
+                   steps_per_hour=steps_per_hour, **kwargs)
+
+    @classmethod
+    def from_file(cls, name, rated_active_power, path, head=None, efficiency=0.85,
+                  dtype=np.float32, steps_per_hour=1, **kwargs) -> HydroPowerPlant:
+        """
+        Ряд из локального файла, отображенного в память: .npy или сырой
+        двоичный ряд dtype (см. write_series). При заданном head в файле
+        расход воды, иначе доли номинальной мощности.
+        """
+        path = Path(path)
+        series = cls._open(path, dtype)
+        if head is None:
+            hpp = cls.from_capacity_factor(name, rated_active_power, series,
+                                           steps_per_hour, **kwargs)
+        else:
+            hpp = cls.from_flow(name, rated_active_power, series, head, efficiency,
+                                steps_per_hour, **kwargs)
+        stat = path.stat()
+        hpp._source = (str(path.resolve()), np.dtype(dtype).str, stat.st_mtime_ns, stat.st_size)
+        return hpp
+
+    @staticmethod
+    def _open(path: Path, dtype) -> np.ndarray:
+        if path.suffix == ".npy":
+            return np.load(path, mmap_mode="r")
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    @staticmethod
+    def write_series(path, chunks, dtype=np.float32) -> Path:
+        """
+        Записать ряд по частям в сырой двоичный файл, не собирая его в памяти:
+        chunks — итерируемое массивов (например, по годам).
+        """
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            for chunk in chunks:
+                f.write(np.ascontiguousarray(chunk, dtype=dtype).tobytes())
+        os.replace(tmp, path)
+        return path
+
+    # memmap при pickle копируется целиком: в процессы пула передается путь
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._source is not None:
+            state["availability"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._source is not None and self.availability is None:
+            path, dtype = self._source[:2]
+            self.availability = self._open(Path(path), np.dtype(dtype))
+
+    # ---------- располагаемая мощность ----------
+    def years(self) -> int:
+        """Число полных лет в ряду (1 без ряда)."""
+        if self.availability is None:
+            return 1
+        return len(self.availability) // (HOURS_PER_YEAR * self.steps_per_hour)
+
+    def hourly_power(self, start: int = 0, hours: int = HOURS_PER_YEAR) -> np.ndarray:
+        """
+        Располагаемая мощность, кВт, по часам [start, start + hours);
+        внутричасовые значения усредняются.
+        """
+        if self.availability is None:
+            return np.full(hours, float(self.rated_active_power))
+        step = self.steps_per_hour
+        part = self.availability[start * step:(start + hours) * step]
+        if len(part) < hours * step:
+            raise ValueError("Ряд располагаемой мощности МГЭС короче запрошенного интервала")
+        power = np.asarray(part, dtype=float)
+        if step > 1:
+            power = power.reshape(hours, step).mean(axis=1)
+        else:
+            power = power.copy()
+        power *= self.availability_scale
+        return np.clip(power, 0, self.rated_active_power, out=power)
+
+    def year_power(self, year: int = 0) -> np.ndarray:
+        """Располагаемая мощность за год ряда, массив (365, 24), кВт."""
+        return self.hourly_power(year * HOURS_PER_YEAR).reshape(365, 24)
+
+    def cache_key(self) -> tuple:
+        """
+        Ключ для кэшей расчетов, зависящих от располагаемой мощности. Ряд в
+        памяти хэшируется один раз: изменять его следует заменой availability
+        целиком, а не правкой на месте.
+        """
+        if self.availability is None:
+            return (self.rated_active_power,)
+        if self._source is not None:
+            source = self._source
+        else:
+            if self._digest is None:
+                self._digest = hashlib.blake2b(np.ascontiguousarray(self.availability).data,
+                                               digest_size=16).hexdigest()
+            source = self._digest
+        return (self.rated_active_power, self.availability_scale, self.steps_per_hour, source)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+
+
+class CalendarDemand:
+    """
+    Почасовой график нагрузки на несколько календарных лет подряд: с учетом
+    високосных лет, рабочих/выходных/праздничных дней и (по желанию)
+    случайных отклонений с фиксированным seed. Ряд можно не собирать целиком,
+    а получать частями — по месяцам или по N часов.
+    """
+
+    def __init__(self, total_active_lp, daily_load_schedule: list[float],
+                 season_factors: dict[str, float], start_year: int, years: int = 1,
+                 profiles: Optional[dict[str, list[float]]] = None,
+                 holidays: Iterable[date | tuple[int, int]] = (),
+                 weekend: tuple[int, ...] = (5, 6),
+                 noise: float = 0.0, day_noise: float = 0.0,
+                 seed: Optional[int] = None) -> None:
+        """
+        profiles — суточные графики для "weekend" и "holiday" (12 или 24 значения, %);
+        если не заданы, праздник берет график выходного, выходной — рабочего дня.
+        holidays — праздники: (месяц, день) каждый год или конкретные date.
+        noise, day_noise — СКО почасовых и посуточных отклонений нагрузки, о.е.
+        """
+        self.base = HourlyDemand(total_active_lp, daily_load_schedule, season_factors)
+        self.start_year = start_year
+        self.years = years
+        profiles = profiles or {}
+        weekday = np.array(self.base.normalize_dls())
+        weekend_dls = self._normalize(profiles.get("weekend"), weekday)
+        holiday_dls = self._normalize(profiles.get("holiday"), weekend_dls)
+        # строки: 0 — рабочий, 1 — выходной, 2 — праздничный день
+        self.profiles = np.stack([weekday, weekend_dls, holiday_dls])
+        self.holidays = {h if isinstance(h, date) else tuple(h) for h in holidays}
+        self.weekend = tuple(weekend)
+        self.noise = noise
+        self.day_noise = day_noise
+        # без seed отклонения все равно воспроизводимы в пределах объекта
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self._months = list(self.base.get_days_in_month().keys())
+
+    @staticmethod
+    def _normalize(dls, default: np.ndarray) -> np.ndarray:
+        if dls is None:
+            return default
+        # та же проверка 12/24 значений, что и в HourlyDemand
+        return np.array(HourlyDemand(1, dls, {}).normalize_dls())
+
+    def __len__(self) -> int:
+        return (date(self.start_year + self.years, 1, 1) -
+                date(self.start_year, 1, 1)).days * 24
+
+    def day_types(self, year: int, month: int) -> np.ndarray:
+        """Тип каждого дня месяца: 0 — рабочий, 1 — выходной, 2 — праздник."""
+        first_weekday, days = monthrange(year, month)
+        types = np.isin((first_weekday + np.arange(days)) % 7, self.weekend).astype(np.intp)
+        for h in self.holidays:
+            if isinstance(h, date):
+                if h.year == year and h.month == month:
+                    types[h.day - 1] = 2
+            elif h[0] == month and h[1] <= days:
+                types[h[1] - 1] = 2
+        return types
+
+    def month_demand(self, year: int, month: int) -> np.ndarray:
+        """Нагрузка месяца (дни, 24). Случайная часть зависит только от seed, года и месяца."""
+        types = self.day_types(year, month)
+        max_lp = self.base.season_factors[self._months[month - 1]] * self.base.total_active_lp
+        demand = max_lp * self.profiles[types]
+        if self.noise or self.day_noise:
+            rng = np.random.default_rng([self.seed, year, month])
+            factor = 1 + self.day_noise * rng.standard_normal((len(types), 1))
+            factor = factor + self.noise * rng.standard_normal(demand.shape)
+            demand *= np.maximum(factor, 0)
+        return demand
+
+    def months(self) -> Iterator[tuple[int, int]]:
+        for year in range(self.start_year, self.start_year + self.years):
+            for month in range(1, 13):
+                yield year, month
+
+    def stream(self, hours: Optional[int] = None
+               ) -> Iterator[tuple[datetime, np.ndarray]]:
+        """
+        Генератор частей ряда (начало части, почасовая нагрузка): по умолчанию
+        помесячно, при заданном hours — частями по hours часов (последняя короче).
+        В памяти держится не больше месяца и одной части.
+        """
+        if hours is None:
+            for year, month in self.months():
+                yield datetime(year, month, 1), self.month_demand(year, month).ravel()
+            return
+
+        buffer, filled, start = np.empty(hours), 0, datetime(self.start_year, 1, 1)
+        for year, month in self.months():
+            values = self.month_demand(year, month).ravel()
+            pos = 0
+            while pos < len(values):
+                take = min(hours - filled, len(values) - pos)
+                buffer[filled: filled + take] = values[pos: pos + take]
+                filled += take
+                pos += take
+                if filled == hours:
+                    yield start, buffer.copy()
+                    start += timedelta(hours=hours)
+                    filled = 0
+        if filled:
+            yield start, buffer[:filled].copy()
+
+    def array(self) -> np.ndarray:
+        """Весь ряд целиком (для коротких расчетов)."""
+        out = np.empty(len(self))
+        pos = 0
+        for _, values in self.stream():
+            out[pos: pos + len(values)] = values
+            pos += len(values)
+        return out
@@ -1,6 +1,12 @@
 from __future__ import annotations
-from typing import Optional
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
 class DemandVisualizer:
     """
@@ -8,11 +14,16 @@ class DemandVisualizer:
     Использует часовые ряды, а подписи на оси X — по центрам месяцев/дней.
     """
 
+    # больше точек на графике не рисуется: длинные ряды прореживаются
+    max_points = 4000
+
     def __init__(self, hd: "HourlyDemand") -> None:
         self.hd = hd
         # фиксируем порядок месяцев из справочника самого класса
         self._days_in_month = self.hd.get_days_in_month()
         self._months = list(self._days_in_month.keys())
+        self._stats = None
+        self._stats_key = None
 
     # ---------- вспомогательные ----------
     @staticmethod
@@ -22,29 +33,52 @@ class DemandVisualizer:
         ax.set_ylabel(ylabel)
         ax.grid(True, alpha=0.3)
 
+    @staticmethod
+    def decimate(y, max_points: int):
+        """
+        Прореживание ряда до ~max_points точек с сохранением огибающей:
+        в каждом блоке остаются минимум и максимум. Возвращает (x, y), x с 1.
+        """
+        y = np.asarray(y)
+        if len(y) <= max_points:
+            return np.arange(1, len(y) + 1), y
+        block = -(-2 * len(y) // max_points)
+        n = len(y) // block * block
+        blocks = y[:n].reshape(-1, block)
+        lo, hi = blocks.argmin(axis=1), blocks.argmax(axis=1)
+        idx = np.arange(0, n, block)[:, None] + np.sort(np.stack([lo, hi], axis=1), axis=1)
+        idx = np.concatenate([idx.ravel(), np.arange(n, len(y))])
+        return idx + 1, y[idx]
+
+    def monthly_stats(self):
+        """
+        Центры месяцев (в часах года) и средняя/минимальная/максимальная мощность
+        по месяцам. Считается одним проходом numpy и кэшируется до изменения графика.
+        """
+        key = self.hd.cache_key()
+        if self._stats is None or key != self._stats_key:
+            y = np.asarray(self.hd())
+            hours = np.array([self._days_in_month[m] * 24 for m in self._months])
+            ends = np.cumsum(hours)
+            starts = ends - hours
+            self._stats = (ends - hours // 2,
+                           np.add.reduceat(y, starts) / hours,
+                           np.minimum.reduceat(y, starts),
+                           np.maximum.reduceat(y, starts))
+            self._stats_key = key
+        return self._stats
+
     # ---------- год ----------
     def plot_year(self, show: bool = True, ax: Optional[plt.Axes] = None) -> plt.Axes:
         """
         Годовой профиль: сплошные линии средней/минимальной/максимальной мощности
         + прозрачный голубой «коридор» между минимумом и максимумом.
         """
-        y = self.hd.year_hourly_demand()
         if ax is None:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(figsize=(12, 4))
 
-        month_centers = []
-        monthly_mean, monthly_min, monthly_max = [], [], []
-
-        pos = 0
-        for m in self._months:
-            hours = self._days_in_month[m] * 24
-            seg = y[pos: pos + hours]
-            pos += hours
-
-            month_centers.append(pos - hours // 2)
-            monthly_mean.append(sum(seg) / len(seg))
-            monthly_min.append(min(seg))
-            monthly_max.append(max(seg))
+        month_centers, monthly_mean, monthly_min, monthly_max = self.monthly_stats()
 
         # голубая полупрозрачная заливка между min и max
         ax.fill_between(month_centers, monthly_min, monthly_max,
@@ -73,6 +107,7 @@ class DemandVisualizer:
 
         ax.legend()
         if show:
+            import matplotlib.pyplot as plt
             plt.tight_layout()
             plt.show()
         return ax
@@ -84,12 +119,13 @@ class DemandVisualizer:
         if month not in self._days_in_month:
             raise ValueError("Неверно указан месяц")
 
-        y = self.hd.month_hourly_demand(month)
+        y = self.hd(month)
         if ax is None:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(figsize=(12, 4))
 
-        x = range(1, len(y) + 1)
-        ax.plot(x, y, linewidth=1)
+        x, y_plot = self.decimate(y, self.max_points)
+        ax.plot(x, y_plot, linewidth=1)
 
         # границы дней и подписи по центрам
         day_starts, day_centers, pos = [], [], 1
@@ -110,6 +146,7 @@ class DemandVisualizer:
         ax.set_ylim(top=max(y) * 1.1)  # +10 % (или +константа: top=max(y)+20)
 
         if show:
+            import matplotlib.pyplot as plt
             plt.tight_layout()
             plt.show()
         return ax
@@ -124,6 +161,7 @@ class DemandVisualizer:
 
         hours = [str(h) for h in range(1, 25)]
         if ax is None:
+            import matplotlib.pyplot as plt
             fig, ax = plt.subplots(figsize=(10, 4))
 
         # ▸ бардовый цвет + чуть более узкие столбцы (width<0.8 «сдвигает» ближе)
@@ -138,7 +176,58 @@ class DemandVisualizer:
         ax.set_ylim(top=max(y_day) * 1.2)
 
         if show:
+            import matplotlib.pyplot as plt
             plt.tight_layout()
             plt.show()
         return ax
 
+    # ---------- пакетная выгрузка ----------
+    def export(self, out_dir, months: Optional[Iterable[str]] = None,
+               days: Iterable[tuple[str, int]] = (), formats: Iterable[str] = ("png",),
+               dpi: int = 100, workers: Optional[int] = None) -> list[Path]:
+        """
+        Сохраняет в out_dir годовой график, графики месяцев (по умолчанию всех 12)
+        и выбранных суток в файлы PNG/SVG без интерактивного вывода.
+        Графики строятся параллельно в процессах (workers=1 — в текущем процессе).
+        Возвращает пути созданных файлов.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        months = self._months if months is None else list(months)
+        for month in months:
+            if month not in self._days_in_month:
+                raise ValueError("Неверно указан месяц")
+        jobs = [("year", ())] + [("month", (m,)) for m in months] + \
+               [("day", (m, d)) for m, d in days]
+        jobs = [(kind, args, out_dir / f"{'_'.join(map(str, (kind, *args)))}.{fmt}", dpi)
+                for kind, args in jobs for fmt in formats]
+
+        if workers == 1 or len(jobs) == 1:
+            _init_export(self.hd)
+            return [_render(job) for job in jobs]
+        with ProcessPoolExecutor(workers, initializer=_init_export,
+                                 initargs=(self.hd,)) as pool:
+            return list(pool.map(_render, jobs))
+
+
+_EXPORT_VIZ: Optional[DemandVisualizer] = None
+
+
+def _init_export(hd) -> None:
+    global _EXPORT_VIZ
+    _EXPORT_VIZ = DemandVisualizer(hd)
+
+
+def _render(job) -> Path:
+    # Figure без pyplot: не нужен ни дисплей, ни интерактивный backend
+    from matplotlib.figure import Figure
+
+    kind, args, path, dpi = job
+    fig = Figure(figsize=(10, 4) if kind == "day" else (12, 4))
+    ax = fig.add_subplot()
+    plot = {"year": _EXPORT_VIZ.plot_year, "month": _EXPORT_VIZ.plot_month,
+            "day": _EXPORT_VIZ.plot_day}[kind]
+    plot(*args, show=False, ax=ax)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return path
@@ -1,22 +1,97 @@
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+import numpy as np
+
+from Practise.instrumentation import timed, count
+from Practise.LoadGraph import resample
+from Practise.LoadGraph.TotalLoad import TotalLoad
+
+
 class HourlyDemand:
-    def __init__(self, total_active_lp, daily_load_schedule: list[float], season_factors: dict[str, float]) -> None:
-        self.daily_load_schedule = []
-        if len(daily_load_schedule) == 12:
-            self.daily_load_schedule = [x for x in daily_load_schedule for _ in range(2)]
-        elif len(daily_load_schedule) == 24:
-            self.daily_load_schedule = daily_load_schedule
-        else: raise NotImplementedError
+    def __init__(self, total_active_lp, daily_load_schedule: list[float], season_factors: dict[str, float],
+                 dtype=np.float64) -> None:
+        """
+        total_active_lp — число или TotalLoad: со связанной суммарной нагрузкой
+        изменение LoadType.load_power сразу меняет график (и ключ кэша).
+        """
+        self.daily_load_schedule = daily_load_schedule
         self.season_factors = season_factors
         self.total_active_lp = total_active_lp
+        # тип кэшированных рядов: np.float32 вдвое сокращает память минутных рядов
+        self.dtype = dtype
+        # кэш годового ряда: непрерывный массив 8760 значений (12 x дни x 24)
+        self._year = None
+        self._key = None
+        # кэш рядов с другим шагом: (шаг, способ) -> (ключ, массив (365, 24 * шагов в часе))
+        self._series: dict[tuple, tuple] = {}
 
     def __call__(self, *args):
+        # возвращаются представления (без копирования) кэшированного годового ряда
         if not args:
-            return self.year_hourly_demand()
+            return self.year_array()
         elif len(args) == 1:
-            return self.month_hourly_demand(args[0])
+            return self.month_array(args[0])
         elif len(args) == 2:
-            return self.daily_hourly_demand(args[0], args[1])
+            return self.day_array(args[0], args[1])
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @dtype.setter
+    def dtype(self, dtype) -> None:
+        self._dtype = np.dtype(dtype)
+        # строка типа для cache_key: сравнивается и хэшируется (stable_hash) как текст
+        self._dtype_key = self._dtype.str
+
+    @property
+    def total_active_lp(self) -> float:
+        if self.total_load is not None:
+            return self.total_load.total_active_lp()
+        return self._total_active_lp
 
+    @total_active_lp.setter
+    def total_active_lp(self, total_active_lp) -> None:
+        if isinstance(total_active_lp, TotalLoad):
+            self.total_load, self._total_active_lp = total_active_lp, None
+        else:
+            self.total_load, self._total_active_lp = None, total_active_lp
+
+    @property
+    def daily_load_schedule(self) -> list[float]:
+        """
+        Часовой суточный график, %. У графика с шагом меньше часа это кортеж
+        средних по часам, который выводится из исходного графика при каждом
+        обращении: править на месте можно только исходный список, часовой
+        график и ряды с любым шагом всегда согласованы с ним.
+        """
+        if self._fine_schedule is None:
+            return self._daily_load_schedule
+        fine = tuple(self._fine_schedule)
+        if fine != self._fine_key:
+            steps = len(fine) // 24
+            self._daily_load_schedule = tuple(resample.downsample(
+                np.asarray(fine, dtype=float), steps).tolist())
+            self._fine_key = fine
+        return self._daily_load_schedule
+
+    @daily_load_schedule.setter
+    def daily_load_schedule(self, daily_load_schedule: list[float]) -> None:
+        # суточный график с шагом меньше часа (96 точек — 15 мин, 288 — 5 мин,
+        # 1440 — 1 мин) хранится как есть, а часовой график — его средние по часам
+        self._fine_schedule = None
+        self._fine_key = None
+        self.schedule_minutes = 60
+        if len(daily_load_schedule) == 12:
+            self._daily_load_schedule = [x for x in daily_load_schedule for _ in range(2)]
+        elif len(daily_load_schedule) == 24:
+            self._daily_load_schedule = daily_load_schedule
+        elif len(daily_load_schedule) % 24 == 0 and 60 % (len(daily_load_schedule) // 24) == 0:
+            self._fine_schedule = daily_load_schedule
+            self.schedule_minutes = 60 // (len(daily_load_schedule) // 24)
+        else: raise NotImplementedError
 
     def season_max_lp(self) -> dict[str, float]:
         season_max_lp_d = self.season_factors.copy()
@@ -44,36 +119,161 @@ class HourlyDemand:
             "Декабрь": 31
         }
 
-    def year_hourly_demand(self) -> list[float]:
-        days_in_month = self.get_days_in_month()
-        year_hourly_demand_lst = []
-        season_max_lp_d = self.season_max_lp()
-        dls_lst = self.normalize_dls()
-        for month, max_lp in season_max_lp_d.items():
-            daily_lp = [max_lp * dls for dls in dls_lst]
-            monthly_lp = daily_lp * days_in_month[month]
-            year_hourly_demand_lst.extend(monthly_lp)
-        return year_hourly_demand_lst
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def month_offsets() -> Mapping[str, tuple[int, int]]:
+        """
+        Месяц -> (номер первого дня года, число дней), год без учета високосности.
+        Словарь общий для всех вызовов (lru_cache), поэтому только для чтения.
+        """
+        offsets, start = {}, 0
+        for month, days in HourlyDemand.get_days_in_month().items():
+            offsets[month] = (start, days)
+            start += days
+        return MappingProxyType(offsets)
 
-    def month_hourly_demand(self, month: str) -> list[float]:
-        if month not in self.get_days_in_month().keys():
+    @staticmethod
+    def month_day(day_index: int) -> tuple[str, int]:
+        """Номер дня года (с 0) -> (месяц, день месяца)."""
+        for month, (start, days) in HourlyDemand.month_offsets().items():
+            if day_index < start + days:
+                return month, day_index - start + 1
+        raise ValueError("Некорректный номер дня года")
+
+    # ---------- кэш годового ряда ----------
+    def cache_key(self) -> tuple:
+        """
+        Ключ исходных данных: меняется при изменении мощности, графика,
+        сезонности или типа рядов dtype.
+        """
+        return (self.total_active_lp, tuple(self.daily_load_schedule),
+                tuple(self.season_factors.items()), self._dtype_key)
+
+    @staticmethod
+    def changed_months(old_key: tuple, new_key: tuple):
+        """
+        Месяцы, ряд которых различается для двух ключей cache_key():
+        список месяцев или None, если изменился суточный график или dtype
+        (меняется весь год).
+        """
+        old_total, old_dls, old_season, old_dtype = old_key
+        new_total, new_dls, new_season, new_dtype = new_key
+        if (old_dls != new_dls or old_dtype != new_dtype
+                or [m for m, _ in old_season] != [m for m, _ in new_season]):
+            return None
+        return [m for (m, old), (_, new) in zip(old_season, new_season)
+                if old * old_total != new * new_total]
+
+    @timed("HourlyDemand.build")
+    def _build(self, months=None) -> np.ndarray:
+        """Годовой ряд или, при months, только строки этих месяцев (массив (дни, 24))."""
+        months = months if months is not None else list(self.get_days_in_month())
+        offsets = self.month_offsets()
+        days = np.fromiter((offsets[m][1] for m in months), dtype=np.intp, count=len(months))
+        max_lp = np.array([self.season_factors[m] * self.total_active_lp for m in months])
+        dls = np.array(self.normalize_dls(), dtype=float)
+        year = np.repeat((max_lp[:, None] * dls[None, :]).astype(self.dtype), days, axis=0).ravel()
+        year.flags.writeable = False
+        return year
+
+    def days_array(self) -> np.ndarray:
+        """
+        Годовой ряд в виде (365, 24) только для чтения. При изменении части
+        коэффициентов сезонности пересчитываются только эти месяцы (в копии:
+        выданные ранее представления остаются неизменными).
+        """
+        key = self.cache_key()
+        if self._year is None:
+            self._year = self._build().reshape(-1, 24)
+        elif key != self._key:
+            months = self.changed_months(self._key, key)
+            if months is None or len(months) == len(self.season_factors):
+                self._year = self._build().reshape(-1, 24)
+            else:
+                count("HourlyDemand.months_rebuilt", len(months))
+                year = self._year.copy()
+                offsets = self.month_offsets()
+                for month in months:
+                    start, days = offsets[month]
+                    year[start:start + days] = self._build([month]).reshape(-1, 24)
+                year.flags.writeable = False
+                self._year = year
+        self._key = key
+        return self._year
+
+    def year_array(self) -> np.ndarray:
+        return self.days_array().ravel()
+
+    def month_array(self, month: str) -> np.ndarray:
+        if month not in self.month_offsets():
             raise ValueError("Неверно указан месяц")
-        days_in_month = self.get_days_in_month()[month]
-        month_max_lp = self.season_max_lp()[month]
-        dls_lst = self.normalize_dls()
-        daily_lp = [month_max_lp * dls for dls in dls_lst]
-        monthly_lp = daily_lp * days_in_month
-        return monthly_lp
+        start, days = self.month_offsets()[month]
+        return self.days_array()[start: start + days].ravel()
 
-    def daily_hourly_demand(self, month: str, day: int) -> list[float]:
-        if month not in self.get_days_in_month().keys():
+    def day_array(self, month: str, day: int) -> np.ndarray:
+        if month not in self.month_offsets():
             raise ValueError("Неверно указан месяц")
-        days_in_month = self.get_days_in_month()[month]
-        if day <= 0 or day > days_in_month:
+        start, days = self.month_offsets()[month]
+        if day <= 0 or day > days:
             raise ValueError("Некорректное число дней в месяце")
-        month_max_lp = self.season_max_lp()[month]
-        dls_lst = self.normalize_dls()
-        daily_lp = [month_max_lp * dls for dls in dls_lst]
-        # day - фиктивный параметр, ибо типовой день растянут на весь месяц.
-        # нужен лишь для различения вызовов функций
-        return daily_lp
+        # day пока выбирает строку типового дня, растянутого на весь месяц
+        return self.days_array()[start + day - 1]
+
+    # ---------- шаг меньше часа ----------
+    def profile(self, minutes: int = 60, method: str = "linear") -> np.ndarray:
+        """
+        Суточный график в о.е. с шагом minutes, мин. Мельче шага исходного
+        графика — интерполяция resample.upsample (method "linear" или "step",
+        энергия каждого интервала сохраняется), крупнее — средние по блокам.
+        """
+        if self._fine_schedule is not None:
+            base, base_minutes = np.asarray(self._fine_schedule, dtype=float), self.schedule_minutes
+        else:
+            base, base_minutes = np.asarray(self.daily_load_schedule, dtype=float), 60
+        return resample.resample(base / 100, base_minutes, minutes, method, periodic=True)
+
+    @timed("HourlyDemand.build_series")
+    def _build_series(self, minutes: int, method: str) -> np.ndarray:
+        months = self.get_days_in_month()
+        days = np.fromiter(months.values(), dtype=np.intp, count=len(months))
+        max_lp = np.array([self.season_factors[m] * self.total_active_lp for m in months])
+        shape = (max_lp[:, None] * self.profile(minutes, method)[None, :]).astype(self.dtype)
+        series = np.repeat(shape, days, axis=0)
+        series.flags.writeable = False
+        return series
+
+    def days_series(self, minutes: int = 60, method: str = "linear") -> np.ndarray:
+        """Годовой ряд с шагом minutes в виде (365, 24 * 60 / minutes) только для чтения."""
+        resample.steps_per_hour(minutes)
+        if minutes == 60:
+            return self.days_array()
+        key = (self.cache_key(), tuple(self._fine_schedule or ()))
+        cached = self._series.get((minutes, method))
+        if cached is None or cached[0] != key:
+            cached = (key, self._build_series(minutes, method))
+            self._series[(minutes, method)] = cached
+        return cached[1]
+
+    def series(self, minutes: int = 60, method: str = "linear") -> np.ndarray:
+        """Годовой ряд с шагом minutes (525 600 значений при шаге 1 мин)."""
+        return self.days_series(minutes, method).ravel()
+
+    def month_series(self, month: str, minutes: int = 60, method: str = "linear") -> np.ndarray:
+        if month not in self.month_offsets():
+            raise ValueError("Неверно указан месяц")
+        start, days = self.month_offsets()[month]
+        return self.days_series(minutes, method)[start: start + days].ravel()
+
+    def peak_demand(self, minutes: int = 60, method: str = "linear") -> float:
+        """Наибольшая нагрузка года при шаге minutes — для выбора пиковой мощности ДЭУ и ПСК."""
+        return float(self.days_series(minutes, method).max())
+
+    # ---------- списочный интерфейс ----------
+    def year_hourly_demand(self) -> list[float]:
+        return self.year_array().tolist()
+
+    def month_hourly_demand(self, month: str) -> list[float]:
+        return self.month_array(month).tolist()
+
+    def daily_hourly_demand(self, month: str, day: int) -> list[float]:
+        return self.day_array(month, day).tolist()
@@ -1,9 +1,56 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 import math
+import weakref
 
 
-@dataclass
-class LoadType:
+class _Owned:
+    # слот вне полей dataclass: asdict/astuple/сравнение его не видят.
+    # Слабые ссылки на суммарные нагрузки (TotalLoad), в которые входит эта
+    # нагрузка (по одной на каждое вхождение), — нагрузка не держит их живыми
+    __slots__ = ("_owners",)
+
+    # копии (copy, pickle) — только поля: копия ни в какую TotalLoad не входит
+    def __getstate__(self):
+        return [getattr(self, f.name) for f in fields(self)]
+
+    def __setstate__(self, state):
+        for f, value in zip(fields(self), state):
+            object.__setattr__(self, f.name, value)
+
+    def _add_owner(self, owner) -> None:
+        owners = getattr(self, "_owners", None)
+        if owners is None:
+            owners = self._owners = []
+        owners.append(weakref.ref(owner))
+
+    def _remove_owner(self, owner, every: bool = False) -> None:
+        owners = getattr(self, "_owners", None)
+        if not owners:
+            return
+        if every:
+            # по тождеству: равные по полям TotalLoad — разные владельцы
+            owners[:] = [ref for ref in owners if ref() is not None and ref() is not owner]
+            return
+        for i, ref in enumerate(owners):
+            if ref() is owner:
+                del owners[i]
+                return
+
+    def _notify_owners(self, old_power: float) -> None:
+        owners = getattr(self, "_owners", None)
+        if not owners:
+            return
+        alive = []
+        for ref in owners:
+            owner = ref()
+            if owner is not None:
+                owner._on_load_change(self, old_power)
+                alive.append(ref)
+        owners[:] = alive
+
+
+@dataclass(slots=True)
+class LoadType(_Owned):
     lp_type: str
     __load_power: float
     cosf: float
@@ -13,7 +60,9 @@ class LoadType:
     def load_power(self): return self.__load_power
 
     @load_power.setter
-    def load_power(self, load_power): self.__load_power = load_power
+    def load_power(self, load_power):
+        old, self.__load_power = self.__load_power, load_power
+        self._notify_owners(old)
 
     def apparent_lp(self):
         return self.__load_power * self.cosf
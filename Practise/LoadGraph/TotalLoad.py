@@ -1,25 +1,165 @@
 from dataclasses import dataclass, field
 from Practise.LoadGraph.LoadType import LoadType
+import numpy as np
 
 
 @dataclass
 class TotalLoad:
+    """
+    Суммарная нагрузка. Кроме списка load_list хранит колонки numpy
+    (мощность, cosf, код типа нагрузки) и суммы, которые обновляются при
+    append/delete/extend и при изменении LoadType.load_power, а не
+    пересчитываются заново при каждом запросе. Менять состав нагрузки
+    следует через методы класса.
+    """
     load_list: list[LoadType] = field(default_factory=list)
 
+    def __post_init__(self):
+        self._rebuild()
+
+    def __getstate__(self):
+        # колонки и суммы восстанавливаются по списку, а у копий нагрузок
+        # (copy.deepcopy, pickle) нет ссылок на копию суммарной нагрузки
+        return {"load_list": self.load_list}
+
+    def __setstate__(self, state):
+        self.load_list = state["load_list"]
+        self._rebuild()
+
+    # ---------- колонки ----------
+    def _rebuild(self):
+        n = len(self.load_list)
+        capacity = max(16, n)
+        self._power = np.zeros(capacity)
+        self._cosf = np.zeros(capacity)
+        self._code = np.zeros(capacity, dtype=np.intp)
+        self._types: dict[str, int] = {}
+        self._n = 0
+        self._active = 0.0
+        self._apparent = 0.0
+        # id(нагрузки) -> строки колонок с ней; None — пересобрать при обращении
+        self._rows: dict[int, list[int]] | None = {}
+        self._write(0, self.load_list)
+        for load in self.load_list:
+            load._remove_owner(self, every=True)
+        for load in self.load_list:
+            load._add_owner(self)
+
+    def _reserve(self, n: int):
+        if n <= len(self._power):
+            return
+        capacity = max(n, 2 * len(self._power))
+        for name in ("_power", "_cosf", "_code"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def _write(self, start: int, loads: list[LoadType]):
+        # запись строк в конец колонок и обновление сумм
+        stop = start + len(loads)
+        self._reserve(stop)
+        power = np.fromiter((l.load_power for l in loads), dtype=float, count=len(loads))
+        cosf = np.fromiter((l.cosf for l in loads), dtype=float, count=len(loads))
+        self._power[start:stop] = power
+        self._cosf[start:stop] = cosf
+        self._code[start:stop] = [self._types.setdefault(l.lp_type, len(self._types))
+                                  for l in loads]
+        if self._rows is not None:
+            for row, load in enumerate(loads, start):
+                self._rows.setdefault(id(load), []).append(row)
+        self._n = stop
+        self._active += float(power.sum())
+        self._apparent += float(power @ cosf)
+
+    def _columns(self):
+        if self._n != len(self.load_list):
+            self._rebuild()
+        n = self._n
+        return self._power[:n], self._cosf[:n], self._code[:n]
+
+    def _on_load_change(self, load: LoadType, old_power: float):
+        delta = load.load_power - old_power
+        self._active += delta
+        self._apparent += delta * load.cosf
+        # правка одной строки на месте, без пересборки колонок
+        if self._rows is None:
+            self._rows = {}
+            for row, item in enumerate(self.load_list[:self._n]):
+                self._rows.setdefault(id(item), []).append(row)
+        for row in self._rows.get(id(load), ()):
+            self._power[row] = load.load_power
+
+    def power_column(self) -> np.ndarray:
+        power = self._columns()[0].view()
+        power.flags.writeable = False
+        return power
+
+    def cosf_column(self) -> np.ndarray:
+        cosf = self._columns()[1].view()
+        cosf.flags.writeable = False
+        return cosf
+
+    # ---------- суммы ----------
     def total_active_lp(self):
-        return sum(self.load_list[i].load_power for i in range(len(self.load_list)))
+        if self._n != len(self.load_list):
+            self._rebuild()
+        return self._active
 
     def total_reactive_lp(self):
-        return sum(self.load_list[i].reactive_lp() for i in range(len(self.load_list)))
+        power, cosf, _ = self._columns()
+        return float(self._reactive(power, cosf).sum())
 
     def total_apparent_lp(self):
-        return sum(self.load_list[i].apparent_lp() for i in range(len(self.load_list)))
+        if self._n != len(self.load_list):
+            self._rebuild()
+        return self._apparent
+
+    @staticmethod
+    def _reactive(power, cosf):
+        # как LoadType.reactive_lp: sqrt(S**2 - P**2)
+        square = (power * cosf) ** 2 - power ** 2
+        if np.any(square < 0):
+            raise ValueError("math domain error")
+        return np.sqrt(square)
+
+    def totals_by_type(self) -> dict[str, dict[str, float]]:
+        """Суммарная активная и полная мощность по каждому lp_type."""
+        power, cosf, code = self._columns()
+        k = len(self._types)
+        active = np.bincount(code, weights=power, minlength=k)
+        apparent = np.bincount(code, weights=power * cosf, minlength=k)
+        counts = np.bincount(code, minlength=k)
+        return {lp_type: {"active": float(active[i]), "apparent": float(apparent[i])}
+                for lp_type, i in self._types.items() if counts[i]}
 
+    # ---------- изменение состава ----------
     def append_load(self, load: LoadType):
+        self._columns()
         self.load_list.append(load)
+        self._write(self._n, [load])
+        load._add_owner(self)
 
     def delete_load(self, idx: int):
-        self.load_list.pop(idx)
+        self._columns()
+        n = self._n
+        if idx < 0:
+            idx += n
+        load = self.load_list.pop(idx)
+        power, cosf = self._power[idx], self._cosf[idx]
+        for col in (self._power, self._cosf, self._code):
+            col[idx:n - 1] = col[idx + 1:n]
+        self._n = n - 1
+        self._active -= float(power)
+        self._apparent -= float(power * cosf)
+        # строки после idx сдвинулись: индекс строк пересоберется при следующей правке
+        self._rows = None
+        load._remove_owner(self)
 
     def extend_load(self, load_lst: list[LoadType]):
-        self.load_list.extend(load_lst)
\ No newline at end of file
+        self._columns()
+        load_lst = list(load_lst)
+        self.load_list.extend(load_lst)
+        self._write(self._n, load_lst)
+        for load in load_lst:
+            load._add_owner(self)
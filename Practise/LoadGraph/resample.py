@@ -0,0 +1,75 @@
+"""
+Пересчет рядов между шагами по времени: 60, 15, 5 и 1 мин (любой делитель 60).
+
+upsample — дробление шага (ступенькой или линейной интерполяцией с
+сохранением энергии каждого исходного интервала), downsample — укрупнение
+блоками (среднее сохраняет энергию, max — пики).
+"""
+from __future__ import annotations
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+
+def steps_per_hour(minutes: int) -> int:
+    """Число интервалов в часе при шаге minutes, мин."""
+    if minutes <= 0 or 60 % minutes:
+        raise ValueError(f"Шаг {minutes} мин не делит час нацело")
+    return 60 // minutes
+
+
+def factor(from_minutes: int, to_minutes: int) -> int:
+    """Во сколько раз шаг from_minutes крупнее (или мельче) шага to_minutes."""
+    steps_per_hour(from_minutes)
+    steps_per_hour(to_minutes)
+    big, small = max(from_minutes, to_minutes), min(from_minutes, to_minutes)
+    if big % small:
+        raise ValueError(f"Шаги {from_minutes} и {to_minutes} мин не кратны")
+    return big // small
+
+
+def upsample(series, n: int, method: str = "linear", periodic: bool = False,
+             dtype=np.float64) -> np.ndarray:
+    """
+    Каждый интервал ряда делится на n. "step" повторяет значение интервала,
+    "linear" интерполирует между серединами интервалов и масштабирует
+    результат так, чтобы среднее по каждому исходному интервалу не менялось.
+    periodic — ряд замкнут (суточный профиль: после 23 ч идет 0 ч).
+    """
+    coarse = np.asarray(series, dtype=float)
+    if n == 1:
+        return coarse.astype(dtype, copy=True)
+    if method == "step":
+        return np.repeat(coarse, n).astype(dtype, copy=False)
+    if method != "linear":
+        raise ValueError(f"Неизвестный способ интерполяции: {method}")
+    m = len(coarse)
+    centers = np.arange(m) + 0.5
+    points = (np.arange(m * n) + 0.5) / n
+    fine = np.interp(points, centers, coarse, period=m if periodic else None)
+    blocks = fine.reshape(m, n)
+    means = blocks.mean(axis=1)
+    scale = np.divide(coarse, means, out=np.zeros_like(coarse), where=means != 0)
+    blocks *= scale[:, None]
+    return fine.astype(dtype, copy=False)
+
+
+def downsample(series, n: int, how: str = "mean", dtype=None) -> np.ndarray:
+    """Укрупнение шага в n раз блоками: "mean" (энергия), "max" или "min"."""
+    fine = np.asarray(series)
+    if len(fine) % n:
+        raise ValueError(f"Длина ряда {len(fine)} не кратна {n}")
+    if how not in ("mean", "max", "min"):
+        raise ValueError(f"Неизвестный способ укрупнения: {how}")
+    result = getattr(fine.reshape(-1, n), how)(axis=1)
+    return result if dtype is None else result.astype(dtype, copy=False)
+
+
+def resample(series, from_minutes: int, to_minutes: int, method: str = "linear",
+             how: str = "mean", periodic: bool = False, dtype=None) -> np.ndarray:
+    """Ряд с шагом from_minutes -> ряд с шагом to_minutes."""
+    n = factor(from_minutes, to_minutes)
+    if to_minutes < from_minutes:
+        return upsample(series, n, method, periodic, dtype or np.float64)
+    return downsample(series, n, how, dtype)
@@ -0,0 +1,201 @@
+"""
+Хранилище почасовых результатов расчета на диске.
+
+Каталог хранилища: meta.json (версия, шаг ряда, число строк, колонки с dtype
+и шириной, произвольные атрибуты) и по одному сырому двоичному файлу на
+колонку. Запись идет частями (ResultsWriter.append), чтение — через
+np.memmap: срезы по часам, месяцам и суткам возвращают представления файла
+без копирования и без загрузки всего ряда в память.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+import json
+import os
+
+import numpy as np
+
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+
+FORMAT_VERSION = 1
+HOURS_PER_YEAR = 8760
+META = "meta.json"
+
+# колонки результатов диспетчеризации по одной величине на час, кроме dg_units
+DISPATCH_COLUMNS = ("demand", "hpp", "hpp_surplus", "bes", "dg", "soc",
+                    "fuel", "unserved", "spilled")
+
+
+@dataclass
+class Column:
+    name: str
+    dtype: str
+    width: int = field(default=1)
+
+    def row_shape(self) -> tuple:
+        return () if self.width == 1 else (self.width,)
+
+
+def _write_meta(path: Path, meta: dict) -> None:
+    tmp = path / f"{META}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path / META)
+
+
+def dispatch_columns(result) -> dict[str, np.ndarray]:
+    """Колонки хранилища из DispatchResult."""
+    return {
+        "demand": result.load,
+        "hpp": result.hpp,
+        "hpp_surplus": np.maximum(result.hpp - result.load, 0),
+        "bes": result.bes,
+        "dg": result.dg,
+        "soc": result.soc,
+        "fuel": result.fuel,
+        "unserved": result.unserved,
+        "spilled": result.spilled,
+        "dg_units": result.dg_units,
+    }
+
+
+class ResultsWriter:
+    """
+    Потоковая запись: колонки объявляются заранее, строки дописываются
+    частями. meta.json обновляется при close(); до этого хранилище
+    помечено незавершенным.
+    """
+
+    def __init__(self, path, columns: dict[str, tuple], steps_per_hour: int = 1,
+                 start_year: Optional[int] = None, attrs: Optional[dict] = None):
+        """columns — {имя: dtype} или {имя: (dtype, ширина)}."""
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.columns = {}
+        for name, spec in columns.items():
+            dtype, width = (spec, 1) if not isinstance(spec, tuple) else spec
+            self.columns[name] = Column(name, np.dtype(dtype).str, int(width))
+        self.steps_per_hour = steps_per_hour
+        self.start_year = start_year
+        self.attrs = dict(attrs or {})
+        self.rows = 0
+        self._files = {name: (self.path / f"{name}.bin").open("wb") for name in self.columns}
+        self._write(complete=False)
+
+    @classmethod
+    def for_dispatch(cls, path, dg_units: int, dtype=np.float64, **kwargs) -> ResultsWriter:
+        """Хранилище под результаты Dispatcher.run с dg_units ДЭУ."""
+        columns = {name: dtype for name in DISPATCH_COLUMNS}
+        columns["dg_units"] = (dtype, dg_units)
+        return cls(path, columns, **kwargs)
+
+    def _write(self, complete: bool) -> None:
+        _write_meta(self.path, {
+            "version": FORMAT_VERSION,
+            "complete": complete,
+            "rows": self.rows,
+            "steps_per_hour": self.steps_per_hour,
+            "start_year": self.start_year,
+            "columns": [vars(c) for c in self.columns.values()],
+            "attrs": self.attrs,
+        })
+
+    def append(self, **arrays) -> None:
+        """Дописать строки во все колонки; число строк во всех колонках одно."""
+        if set(arrays) != set(self.columns):
+            raise ValueError(f"Ожидаются колонки {sorted(self.columns)}")
+        rows = None
+        for name, values in arrays.items():
+            column = self.columns[name]
+            values = np.asarray(values, dtype=column.dtype)
+            if values.shape[1:] != column.row_shape():
+                raise ValueError(f"Колонка {name}: строки формы {values.shape[1:]}, "
+                                 f"ожидается {column.row_shape()}")
+            if rows is None:
+                rows = len(values)
+            elif len(values) != rows:
+                raise ValueError("Колонки разной длины")
+        for name, values in arrays.items():
+            column = self.columns[name]
+            self._files[name].write(np.ascontiguousarray(values, dtype=column.dtype).tobytes())
+        self.rows += rows
+
+    def append_dispatch(self, result) -> None:
+        self.append(**dispatch_columns(result))
+
+    def close(self) -> ResultsStore:
+        for f in self._files.values():
+            f.close()
+        self._write(complete=True)
+        return ResultsStore(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self._files.values():
+                f.close()
+
+
+class ResultsStore:
+    """
+    Чтение хранилища через np.memmap. Все срезы — представления только для
+    чтения; копирование происходит лишь при явном np.array(...).
+    Год ряда — 8760 часов, месяцы и сутки — как в HourlyDemand.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        meta = json.loads((self.path / META).read_text(encoding="utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия хранилища: {meta.get('version')}")
+        if not meta["complete"]:
+            raise ValueError(f"Запись хранилища {self.path} не завершена")
+        self.meta = meta
+        self.rows = meta["rows"]
+        self.steps_per_hour = meta["steps_per_hour"]
+        self.attrs = meta["attrs"]
+        self.columns = {c["name"]: Column(**c) for c in meta["columns"]}
+        self._maps: dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Колонка целиком (memmap)."""
+        data = self._maps.get(name)
+        if data is None:
+            column = self.columns[name]
+            if self.rows == 0:
+                data = np.empty((0, *column.row_shape()), dtype=column.dtype)
+            else:
+                data = np.memmap(self.path / f"{name}.bin", dtype=column.dtype, mode="r",
+                                 shape=(self.rows, *column.row_shape()))
+            self._maps[name] = data
+        return data
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def years(self) -> int:
+        return self.rows // (HOURS_PER_YEAR * self.steps_per_hour)
+
+    def hours(self, name: str, start: int, stop: int) -> np.ndarray:
+        """Строки за часы [start, stop) от начала ряда."""
+        step = self.steps_per_hour
+        if not 0 <= start <= stop <= self.rows // step:
+            raise ValueError(f"Интервал часов [{start}, {stop}) вне ряда из "
+                             f"{self.rows // step} ч")
+        return self[name][start * step:stop * step]
+
+    def month(self, name: str, month: str, year: int = 0) -> np.ndarray:
+        start, days = HourlyDemand.month_offsets()[month]
+        first = year * HOURS_PER_YEAR + start * 24
+        return self.hours(name, first, first + days * 24)
+
+    def day(self, name: str, month: str, day: int, year: int = 0) -> np.ndarray:
+        start, days = HourlyDemand.month_offsets()[month]
+        if not 1 <= day <= days:
+            raise ValueError(f"В месяце {month} нет дня {day}")
+        first = year * HOURS_PER_YEAR + (start + day - 1) * 24
+        return self.hours(name, first, first + 24)
@@ -1,5 +1,33 @@
+from collections import OrderedDict
 from dataclasses import dataclass, field
+import weakref
 from Practise.Storage.BES import BES
+from Practise.Storage import degradation
+from Practise import instrumentation
+import numpy as np
+
+
+# (ключ графика нагрузки, ключ МГЭС) -> (энергия избытка МГЭС по суткам
+# (годы ряда, 365), наибольший избыток за сутки по (годам, месяцам), номер
+# этих суток в месяце); ключи по содержимому, поэтому одинаковые графики
+# разных объектов HourlyDemand пользуются одной записью
+_SURPLUS_CACHE: OrderedDict = OrderedDict()
+_SURPLUS_CACHE_SIZE = 256
+# график нагрузки -> ключ, с которым для него последний раз считалась запись:
+# от нее после правки графика пересчитываются только измененные месяцы
+_LAST_KEY: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+@instrumentation.timed("BESbank.daily_surplus_energy")
+def daily_surplus_energy(days_demand, hpp_power):
+    """
+    Энергия избытка МГЭС за каждые сутки: сумма положительных разностей
+    (hpp_power - нагрузка) по часам. days_demand — массив (дни, 24),
+    hpp_power — число или массив, согласованный с days_demand по форме.
+    """
+    surplus = np.subtract(hpp_power, days_demand)
+    np.maximum(surplus, 0, out=surplus)
+    return surplus.sum(axis=1)
 
 
 @dataclass
@@ -9,26 +37,121 @@ class BESbank:
     rated_voltage: float = field(default=3.2)
     efficiency: float = field(default=0.96) # li-ion, pb - 0.8
 
+    @staticmethod
+    def _fill_surplus(table, hourly_demand, hpp, months):
+        """
+        Энергия избытка по суткам месяцев months — на месте в table (годы, 365).
+        Возвращает наибольший избыток за сутки и номер этих суток в месяце
+        (с 0), массивы (годы, len(months)).
+        """
+        days_demand = hourly_demand.days_array()
+        offsets = hourly_demand.month_offsets()
+        if hpp.availability is None:
+            # все сутки месяца одинаковы: достаточно одной строки на месяц
+            starts = [offsets[m][0] for m in months]
+            maxima = daily_surplus_energy(days_demand[starts], hpp.rated_active_power)
+            if len(months) == len(offsets):
+                table[0] = np.repeat(maxima, [offsets[m][1] for m in months])
+            else:
+                for month, energy in zip(months, maxima.tolist()):
+                    start, n = offsets[month]
+                    table[0, start:start + n] = energy
+            return maxima[None, :], np.zeros((1, len(months)), dtype=np.intp)
+        years = table.shape[0]
+        maxima = np.empty((years, len(months)))
+        day = np.empty((years, len(months)), dtype=np.intp)
+        # многолетний ряд читается по месяцу, а не целиком
+        for year in range(years):
+            for j, month in enumerate(months):
+                start, n = offsets[month]
+                power = hpp.hourly_power(year * 8760 + start * 24, n * 24).reshape(n, 24)
+                daily = table[year, start:start + n]
+                daily[:] = daily_surplus_energy(days_demand[start:start + n], power)
+                day[year, j] = daily.argmax()
+                maxima[year, j] = daily[day[year, j]]
+        return maxima, day
+
+    def _surplus_state(self, hourly_demand, hpp) -> tuple:
+        key = hourly_demand.cache_key()
+        hpp_key = hpp.cache_key()
+        state = _SURPLUS_CACHE.get((key, hpp_key))
+        if state is not None:
+            instrumentation.count("BESbank.surplus_cache.hit")
+            _SURPLUS_CACHE.move_to_end((key, hpp_key))
+            return state
+        months = list(hourly_demand.month_offsets())
+        last = _LAST_KEY.get(hourly_demand)
+        base = _SURPLUS_CACHE.get((last, hpp_key)) if last is not None else None
+        changed = hourly_demand.changed_months(last, key) if base is not None else None
+        if changed is None:
+            instrumentation.count("BESbank.surplus_cache.miss")
+            table = np.empty((hpp.years(), 365))
+            state = (table, *self._fill_surplus(table, hourly_demand, hpp, months))
+        else:
+            instrumentation.count("BESbank.surplus_cache.months", len(changed))
+            # в копиях: выданные ранее таблицы остаются неизменными
+            table, maxima, day = (a.copy() for a in base)
+            columns = [months.index(m) for m in changed]
+            maxima[:, columns], day[:, columns] = \
+                self._fill_surplus(table, hourly_demand, hpp, changed)
+            state = (table, maxima, day)
+        for array in state:
+            array.flags.writeable = False
+        _SURPLUS_CACHE[(key, hpp_key)] = state
+        if len(_SURPLUS_CACHE) > _SURPLUS_CACHE_SIZE:
+            _SURPLUS_CACHE.popitem(last=False)
+        _LAST_KEY[hourly_demand] = key
+        return state
+
+    def surplus_energy(self, hourly_demand, hpp):
+        """
+        Таблица энергии избытка МГЭС по суткам, только для чтения: (365,) при
+        постоянной мощности МГЭС, (годы ряда * 365,) при ряде availability.
+        Многолетний ряд читается по одному месяцу.
+        """
+        return self._surplus_state(hourly_demand, hpp)[0].reshape(-1)
+
+    def worst_days(self, hourly_demand, hpp):
+        """
+        Наибольший избыток МГЭС за сутки по (годам ряда, месяцам) и номер суток
+        в месяце (с 0), только для чтения. Строятся по той же таблице, что и
+        surplus_energy: она хранится в ограниченном LRU по содержимому графика
+        и ряда МГЭС, и после изменения графика (мощности TotalLoad,
+        коэффициентов сезонности) пересчитываются только месяцы, ряд которых
+        изменился.
+        """
+        _, maxima, day = self._surplus_state(hourly_demand, hpp)
+        return maxima, day
+
+    def worst_day(self, hourly_demand, hpp) -> tuple[float, int, str, int]:
+        """
+        Сутки наибольшего избытка МГЭС: (энергия, год ряда МГЭС с 0, месяц,
+        день месяца); при равных — первые по порядку (год, месяц).
+        """
+        maxima, day = self.worst_days(hourly_demand, hpp)
+        index = int(maxima.argmax())
+        year, column = divmod(index, maxima.shape[1])
+        month = list(hourly_demand.month_offsets())[column]
+        return float(maxima.flat[index]), year, month, int(day.flat[index]) + 1
+
     def charge_energy(self, hourly_demand, hpp):
-        hpp_power = hpp.rated_active_power
-        days_in_month = hourly_demand.get_days_in_month()
-        res_energy = 0
-        hd_params = ["Плуто", 666]
-        for month in days_in_month.keys():
-            for day in range(1, days_in_month[month]+1):
-                hd = hourly_demand(month, day)
-                energy = sum(hpp_power - lp for lp in hd if hpp_power - lp > 0)
-                if energy > res_energy:
-                    res_energy = energy
-                    hd_params = [month, day]
-        return res_energy, hd_params
+        """
+        Энергия заряда и [месяц, день] суток наибольшего избытка. У многолетнего
+        ряда МГЭС это наихудшие сутки по всем годам; год — в worst_day.
+        """
+        res_energy, _, month, day = self.worst_day(hourly_demand, hpp)
+        if res_energy <= 0:
+            return 0, ["Плуто", 666]
+        return res_energy, [month, day]
 
-    def total_capacity(self, hourly_demand, hpp):
-        res_energy, _ = self.charge_energy(hourly_demand, hpp)
-        sum_capacity = res_energy / (
+    def capacity_for_energy(self, res_energy):
+        return res_energy / (
             self.rated_voltage * self.dod * self.efficiency
         )
-        return sum_capacity
+
+    def total_capacity(self, hourly_demand, hpp):
+        res_energy, _ = self.charge_energy(hourly_demand, hpp)
+        return self.capacity_for_energy(res_energy)
 
     def number_bes_parall(self, hourly_demand, hpp, bes_capacity):
         return self.total_capacity(hourly_demand, hpp) / bes_capacity
@@ -38,3 +161,11 @@ class BESbank:
 
     def number_of_bes(self, hourly_demand, hpp, bes_capacity, bes_voltage):
         return self.number_bes_parall(hourly_demand, hpp, bes_capacity) * self.number_bes_series(bes_voltage)
+
+    def degradation(self, soc, hours_per_step=1.0):
+        """
+        Износ АКБ банка по ряду SoC (например, DispatchResult.soc или memmap
+        многолетнего ряда): {название АКБ: DegradationEstimate}.
+        """
+        units = list({bes.name: bes for bes in self.units}.values())
+        return degradation.degradation(soc, units, hours_per_step)
@@ -0,0 +1,258 @@
+"""
+Износ АКБ по ряду степени заряженности (SoC) банка: подсчет циклов методом
+дождя (rainflow) за один проход по ряду и оценка потери емкости и года
+замены для каждого типа химии АКБ.
+
+Ряд подается частями (массивы, в том числе np.memmap), поэтому 25-летний
+ряд с шагом 1 мин не собирается в памяти целиком: хранятся только текущий
+стек экстремумов и гистограмма размахов циклов.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+import math
+import re
+
+import numpy as np
+
+from Practise.Storage.BES import BES
+
+HOURS_PER_YEAR = 8760
+# размер части, которой читается ряд-массив (memmap читается по частям)
+CHUNK = 1 << 20
+
+
+@dataclass
+class Chemistry:
+    """
+    Ресурс АКБ: cycle_life циклов при глубине разряда 100 % до остаточной
+    емкости eol; при глубине d — cycle_life * d**-dod_exponent циклов.
+    calendar_fade — календарная потеря емкости за год, о.е.
+    """
+    name: str
+    cycle_life: float
+    dod_exponent: float
+    calendar_fade: float
+    eol: float = field(default=0.8)
+
+    def cycles_to_eol(self, depth):
+        return self.cycle_life * np.power(depth, -self.dod_exponent)
+
+
+# ориентировочные паспортные значения, уточняются по данным производителя
+CHEMISTRIES = {
+    "LYP": Chemistry("LYP", 2500, 1.3, 0.010),
+    "LFP": Chemistry("LFP", 3000, 1.4, 0.010),
+    "NMC": Chemistry("NMC", 1500, 1.5, 0.020),
+    "LTO": Chemistry("LTO", 10000, 1.0, 0.005),
+    "Pb": Chemistry("Pb", 400, 1.3, 0.025),
+}
+
+_CHEMISTRY_NAMES = re.compile(r"LYP|LFP|NMC|LTO|PB|AGM|GEL")
+
+
+def chemistry_of(bes: BES) -> Chemistry:
+    """Тип химии по названию АКБ из каталога (например, LT-LYP200 -> LYP)."""
+    match = _CHEMISTRY_NAMES.search(bes.name.upper())
+    if match is None:
+        raise ValueError(f"Не удалось определить тип химии АКБ {bes.name}")
+    name = match.group()
+    return CHEMISTRIES["Pb" if name in ("PB", "AGM", "GEL") else name]
+
+
+class Rainflow:
+    """
+    Потоковый подсчет циклов методом дождя (ASTM E1049) по ряду SoC, о.е.
+    Экстремумы, размах между которыми меньше hysteresis, отбрасываются;
+    поэтому стек незакрытых полуциклов не длиннее ~1 / hysteresis, а циклы
+    копятся в гистограмме размахов с шагом bin_width.
+    """
+
+    def __init__(self, hysteresis: float = 1e-3, bin_width: float = 0.005):
+        if hysteresis <= 0:
+            raise ValueError("Порог hysteresis должен быть положительным")
+        self.hysteresis = hysteresis
+        self.bin_width = bin_width
+        self.counts = np.zeros(int(math.ceil(1 / bin_width)) + 1)
+        self.samples = 0
+        self._last: Optional[float] = None   # последний отсчет ряда
+        self._trend = 0                      # направление ряда на последнем шаге
+        self._anchor: Optional[float] = None # последний принятый экстремум
+        self._peak: Optional[float] = None   # текущий кандидат в экстремумы
+        self._direction = 0
+        self._stack: list[float] = []
+        self._finished = False
+
+    # ---------- ввод ряда ----------
+    def push(self, soc) -> None:
+        """Следующая часть ряда SoC."""
+        if self._finished:
+            raise ValueError("Подсчет циклов уже завершен")
+        x = np.asarray(soc, dtype=float).ravel()
+        if not len(x):
+            return
+        self.samples += len(x)
+        if self._last is None:
+            self._extremum(float(x[0]))
+        else:
+            x = np.concatenate(([self._last], x))
+        self._last = float(x[-1])
+
+        # локальные экстремумы части: смена знака приращения (без площадок)
+        d = np.diff(x)
+        steps = np.flatnonzero(d)
+        if not len(steps):
+            return
+        sign = np.sign(d[steps])
+        turns = np.flatnonzero(sign[1:] != sign[:-1]) + 1
+        values = x[steps[turns]].tolist()
+        if self._trend and sign[0] != self._trend:
+            values.insert(0, x[0])
+        self._trend = int(sign[-1])
+        values.append(self._last)
+        i = 0
+        while i < len(values) and self._direction == 0:
+            self._extremum(values[i])
+            i += 1
+        # то же, что _extremum при известном направлении, на локальных переменных
+        peak, direction, h = self._peak, self._direction, self.hysteresis
+        for value in values[i:]:
+            if (value - peak) * direction >= 0:
+                peak = value
+            elif abs(peak - value) >= h:
+                self._reversal(peak)
+                self._anchor, peak = peak, value
+                direction = -direction
+        self._peak, self._direction = peak, direction
+
+    def _extremum(self, value: float) -> None:
+        # фильтр гистерезиса: экстремум принимается, когда ряд отошел от него
+        # больше чем на hysteresis
+        if self._anchor is None:
+            self._anchor = self._peak = value
+            return
+        if self._direction == 0:
+            if abs(value - self._anchor) >= self.hysteresis:
+                self._direction = 1 if value > self._anchor else -1
+                self._reversal(self._anchor)
+                self._peak = value
+            elif abs(value - self._anchor) > abs(self._peak - self._anchor):
+                self._peak = value
+            return
+        if (value - self._peak) * self._direction >= 0:
+            self._peak = value
+        elif abs(self._peak - value) >= self.hysteresis:
+            self._reversal(self._peak)
+            self._anchor, self._peak = self._peak, value
+            self._direction = -self._direction
+
+    def _reversal(self, value: float) -> None:
+        stack = self._stack
+        stack.append(value)
+        while len(stack) >= 3:
+            x = abs(stack[-1] - stack[-2])
+            y = abs(stack[-2] - stack[-3])
+            if x < y:
+                break
+            if len(stack) == 3:
+                self._count(y, 0.5)
+                del stack[0]
+            else:
+                self._count(y, 1.0)
+                del stack[-3:-1]
+
+    def _count(self, depth: float, n: float) -> None:
+        self.counts[min(int(depth / self.bin_width + 0.5), len(self.counts) - 1)] += n
+
+    def finish(self) -> Rainflow:
+        """Закрыть ряд: незакрытые размахи считаются полуциклами."""
+        if not self._finished:
+            if self._direction and self._peak is not None:
+                self._reversal(self._peak)
+            stack = self._stack
+            for a, b in zip(stack, stack[1:]):
+                self._count(abs(b - a), 0.5)
+            stack.clear()
+            self._finished = True
+        return self
+
+    # ---------- результат ----------
+    def depths(self) -> np.ndarray:
+        """Глубины разряда (середины интервалов гистограммы), о.е."""
+        return np.arange(len(self.counts)) * self.bin_width
+
+    def equivalent_full_cycles(self) -> float:
+        return float(self.depths() @ self.counts)
+
+    def damage(self, chemistry: Chemistry) -> float:
+        """Доля циклового ресурса (правило Майнера), израсходованная за ряд."""
+        depths = self.depths()[1:]
+        return float((self.counts[1:] / chemistry.cycles_to_eol(depths)).sum())
+
+
+@dataclass
+class DegradationEstimate:
+    """Потеря емкости АКБ (линейная по годам) и год замены."""
+    chemistry: str
+    equivalent_full_cycles_per_year: float
+    cycle_fade_per_year: float
+    calendar_fade_per_year: float
+    replacement_year: float  # лет от ввода в работу до остаточной емкости eol
+
+    def fade_per_year(self) -> float:
+        return self.cycle_fade_per_year + self.calendar_fade_per_year
+
+    def capacity(self, year: float) -> float:
+        """Остаточная емкость через year лет после установки (или замены), о.е."""
+        years_since = year % self.replacement_year if math.isfinite(self.replacement_year) else year
+        return 1 - self.fade_per_year() * years_since
+
+    def replacements(self, horizon: float) -> list[float]:
+        """Годы замен АКБ на горизонте расчета, лет от ввода в работу."""
+        if not math.isfinite(self.replacement_year):
+            return []
+        return [k * self.replacement_year
+                for k in range(1, int(horizon // self.replacement_year) + 1)]
+
+
+def count_cycles(soc, hysteresis: float = 1e-3) -> Rainflow:
+    """
+    Циклы ряда SoC: массив (в том числе np.memmap, читается частями по CHUNK)
+    или итерируемое частей ряда.
+    """
+    rainflow = Rainflow(hysteresis)
+    if isinstance(soc, np.ndarray):
+        for start in range(0, len(soc), CHUNK):
+            rainflow.push(soc[start:start + CHUNK])
+    else:
+        for chunk in soc:
+            rainflow.push(chunk)
+    return rainflow.finish()
+
+
+def estimate(rainflow: Rainflow, chemistry: Chemistry,
+             hours_per_step: float = 1.0) -> DegradationEstimate:
+    """Оценка износа по подсчитанным циклам ряда с шагом hours_per_step, ч."""
+    years = rainflow.samples * hours_per_step / HOURS_PER_YEAR
+    if years <= 0:
+        raise ValueError("Ряд SoC пуст")
+    cycle_fade = (1 - chemistry.eol) * rainflow.damage(chemistry) / years
+    fade = cycle_fade + chemistry.calendar_fade
+    return DegradationEstimate(
+        chemistry=chemistry.name,
+        equivalent_full_cycles_per_year=rainflow.equivalent_full_cycles() / years,
+        cycle_fade_per_year=cycle_fade,
+        calendar_fade_per_year=chemistry.calendar_fade,
+        replacement_year=(1 - chemistry.eol) / fade if fade > 0 else math.inf,
+    )
+
+
+def degradation(soc, units: Iterable[BES], hours_per_step: float = 1.0,
+                hysteresis: float = 1e-3) -> dict[str, DegradationEstimate]:
+    """
+    Оценка износа каждого типа АКБ банка по общему ряду SoC: {название АКБ: оценка}.
+    Ряд проходится один раз, циклы общие для всех типов.
+    """
+    rainflow = count_cycles(soc, hysteresis)
+    return {bes.name: estimate(rainflow, chemistry_of(bes), hours_per_step)
+            for bes in units}
@@ -1,14 +1,36 @@
-from Practise.LoadGraph.LoadType import LoadType
-from Practise.LoadGraph.TotalLoad import TotalLoad
-from Practise.LoadGraph.HourlyDemand import HourlyDemand
-from Practise.LoadGraph.DemandVisualizer import DemandVisualizer
-from Practise.Generators.Diesel.DieselPowerUnit import DieselPowerUnit
-from Practise.Generators.Diesel.DieselGenerator import DieselGenerator
-from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant
-from Practise.Storage.BESbank import BESbank
-from Practise.Storage.BES import BES
-from Practise.Invertors.PCS import PCS
-
-__all__ = ['LoadType', 'TotalLoad', 'HourlyDemand',
+from importlib import import_module
+
+# подмодули загружаются при первом обращении к имени: так `import Practise`
+# не тянет matplotlib и pandas в процессы, которым они не нужны
+_LAZY = {
+    'LoadType': 'Practise.LoadGraph.LoadType',
+    'TotalLoad': 'Practise.LoadGraph.TotalLoad',
+    'HourlyDemand': 'Practise.LoadGraph.HourlyDemand',
+    'CalendarDemand': 'Practise.LoadGraph.CalendarDemand',
+    'DemandVisualizer': 'Practise.LoadGraph.DemandVisualizer',
+    'DieselPowerUnit': 'Practise.Generators.Diesel.DieselPowerUnit',
+    'DieselGenerator': 'Practise.Generators.Diesel.DieselGenerator',
+    'HydroPowerPlant': 'Practise.Generators.Hydro.HydroPowerPlant',
+    'BESbank': 'Practise.Storage.BESbank',
+    'BES': 'Practise.Storage.BES',
+    'PCS': 'Practise.Invertors.PCS',
+    'ResultsStore': 'Practise.Results.ResultsStore',
+    'DiskCache': 'Practise.Cache.DiskCache',
+}
+
+__all__ = ['LoadType', 'TotalLoad', 'HourlyDemand', 'CalendarDemand',
            'DemandVisualizer', 'DieselPowerUnit', 'DieselGenerator',
-           'HydroPowerPlant', 'BESbank', 'BES', 'PCS']
\ No newline at end of file
+           'HydroPowerPlant', 'BESbank', 'BES', 'PCS', 'ResultsStore',
+           'DiskCache']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
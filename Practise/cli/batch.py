@@ -0,0 +1,232 @@
+"""
+Пакетный расчет многих объектов по файлу сценариев (JSON или TOML).
+
+    python -m Practise.cli.batch sites.toml --out summary.csv --workers 8
+
+Файл сценариев: необязательная секция defaults и список sites; поля объекта
+перекрывают defaults. Пример (TOML):
+
+    [defaults]
+    daily_load_schedule = [15, 15, 25, 70, 60, 70, 80, 55, 70, 100, 65, 30]
+    season_factors = {"Январь" = 1.0, "Февраль" = 1.0, ...}
+    assembly = ["2x50", "3x30+10"]
+
+    [[sites]]
+    name = "Базированная"
+    hpp = 80                                 # или {rated = 80, file = "flow.npy", head = 12}
+    loads = [{lp_type = "Жилой сектор", load_power = 67, cosf = 0.95}]
+
+Для каждого объекта: график нагрузки, компоновка ДЭС (из списка assembly —
+наименьшая по мощности), энергия заряда и самый дешевый набор АКБ из
+каталога. Каталоги читаются один раз (с кэшем на диске) и передаются
+процессам пула при их запуске; результаты по объектам кэшируются на диске
+(DiskCache), так что повторный запуск считает только измененные объекты.
+Итог — одна строка на объект в CSV или JSON.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import tomllib
+
+from Practise.LoadGraph.LoadType import LoadType
+from Practise.LoadGraph.TotalLoad import TotalLoad
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+from Practise.Generators.Diesel.DieselGenerator import DieselGenerator
+from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant
+from Practise.Storage.BESbank import BESbank
+from Practise.Catalogue import loader as catalogue
+from Practise.Cache.DiskCache import DiskCache, stable_hash
+
+SUMMARY_FIELDS = ["name", "total_active_lp", "total_apparent_lp", "hpp_rated_power",
+                  "dg_assembly", "dg_rated_apparent_power", "dg_units",
+                  "charge_energy", "charge_day", "bank_capacity",
+                  "bes_name", "number_of_bes", "bes_cost", "error"]
+
+
+def read_config(path) -> list[dict]:
+    """Объекты из файла сценариев (.json или .toml) с примененными defaults."""
+    path = Path(path)
+    if path.suffix.lower() == ".toml":
+        with path.open("rb") as f:
+            config = tomllib.load(f)
+    else:
+        config = json.loads(path.read_text(encoding="utf-8"))
+    defaults = config.get("defaults", {})
+    sites = [{**defaults, **site} for site in config.get("sites", [])]
+    for i, site in enumerate(sites):
+        missing = [k for k in ("name", "loads", "daily_load_schedule", "season_factors",
+                               "hpp", "assembly") if k not in site]
+        if missing:
+            raise ValueError(f"Объект №{i + 1} ({site.get('name', '?')}): нет полей {missing}")
+        # относительные пути к рядам МГЭС — от файла сценариев
+        if isinstance(site["hpp"], dict) and "file" in site["hpp"]:
+            site["hpp"] = {**site["hpp"], "file": str(path.parent / site["hpp"]["file"])}
+    return sites
+
+
+def build_hpp(site: dict) -> HydroPowerPlant:
+    hpp = site["hpp"]
+    if not isinstance(hpp, dict):
+        return HydroPowerPlant(site["name"], float(hpp))
+    if "file" in hpp:
+        return HydroPowerPlant.from_file(site["name"], float(hpp["rated"]), hpp["file"],
+                                         head=hpp.get("head"),
+                                         efficiency=hpp.get("efficiency", 0.85),
+                                         steps_per_hour=hpp.get("steps_per_hour", 1))
+    return HydroPowerPlant(site["name"], float(hpp["rated"]))
+
+
+_CONTEXT: dict = {}
+
+
+def _init_worker(context: dict) -> None:
+    _CONTEXT.clear()
+    _CONTEXT.update(context)
+
+
+def run_site(site: dict) -> dict:
+    """Расчет одного объекта; ошибка объекта попадает в строку итога, а не прерывает пакет."""
+    row = dict.fromkeys(SUMMARY_FIELDS, "")
+    row["name"] = site.get("name", "")
+    try:
+        loads = TotalLoad([LoadType(l["lp_type"], float(l["load_power"]), float(l["cosf"]))
+                           for l in site["loads"]])
+        total_active_lp = loads.total_active_lp()
+        hourly_demand = HourlyDemand(total_active_lp, site["daily_load_schedule"],
+                                     site["season_factors"])
+        hpp = build_hpp(site)
+        row.update(total_active_lp=total_active_lp,
+                   total_apparent_lp=loads.total_apparent_lp(),
+                   hpp_rated_power=hpp.rated_active_power)
+
+        # одинаковые исходные данные (в том числе версия каталогов) — результат из кэша
+        catalogue_key = _CONTEXT["catalogue_key"]
+        row.update(_cached(("batch.assemble_dg", site["assembly"], total_active_lp, catalogue_key),
+                           lambda: assemble_dg(site, total_active_lp)))
+        bank = BESbank(dod=site.get("dod", 0.8), efficiency=site.get("efficiency", 0.96))
+        row.update(_cached(("batch.size_bes", hourly_demand, hpp, bank, site.get("bes"),
+                            catalogue_key),
+                           lambda: size_bes(site, bank, hourly_demand, hpp)))
+    except Exception as error:
+        row["error"] = f"{type(error).__name__}: {error}"
+    return row
+
+
+def _cached(key_parts: tuple, compute):
+    cache = _CONTEXT.get("cache")
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(stable_hash(*key_parts), compute)
+
+
+def assemble_dg(site: dict, total_active_lp: float) -> dict:
+    """Компоновка ДЭС: наименьшая по мощности из собранных по шаблонам site["assembly"]."""
+    best = None
+    for pattern in site["assembly"]:
+        dg = DieselGenerator(site["name"], pattern)
+        dg.auto_assembly_dg(_CONTEXT["dpu_index"], total_active_lp)
+        if dg.rated_apparent_power < total_active_lp * (1 - 1e-9):
+            continue
+        if best is None or dg.rated_apparent_power < best.rated_apparent_power:
+            best = dg
+    if best is None:
+        return {}
+    return {"dg_assembly": best.assembly_type,
+            "dg_rated_apparent_power": best.rated_apparent_power,
+            "dg_units": "; ".join(u.name for u in best.units)}
+
+
+def size_bes(site: dict, bank: BESbank, hourly_demand, hpp) -> dict:
+    """Энергия заряда и самый дешевый набор АКБ из каталога (емкость в кА·ч, как total_capacity)."""
+    energy, day = bank.charge_energy(hourly_demand, hpp)
+    charge_day = f"{day[0]} {day[1]}"
+    if energy > 0 and hpp.years() > 1:
+        charge_day += f", год {bank.worst_day(hourly_demand, hpp)[1] + 1}"
+    result = {"charge_energy": energy, "charge_day": charge_day,
+              "bank_capacity": bank.capacity_for_energy(energy)}
+    names = site.get("bes")
+    choice = None
+    for bes in _CONTEXT["bes_base"]:
+        if names and bes.name not in names:
+            continue
+        count = math.ceil(bank.number_of_bes(hourly_demand, hpp, bes.rated_capacity / 1000,
+                                             bes.rated_voltage))
+        if choice is None or count * bes.price < choice[2]:
+            choice = (bes.name, count, count * bes.price)
+    if choice is not None:
+        result.update(bes_name=choice[0], number_of_bes=choice[1], bes_cost=choice[2])
+    return result
+
+
+def run_batch(sites: list[dict], workers: int | None = None,
+              data_dir: Path | None = None, cache: DiskCache | None = None) -> list[dict]:
+    """
+    Строки итога по объектам в порядке sites. С cache результаты компоновки
+    ДЭС и подбора АКБ берутся с диска, если исходные данные объекта и
+    каталоги не менялись.
+    """
+    catalogue.ingest_all(("dpu", "bes"), data_dir)
+    dpu_index = catalogue.catalogue_index("dpu", "rated_apparent_power", data_dir)
+    bes_base = catalogue.bes_base(data_dir)
+    context = {"dpu_index": dpu_index, "bes_base": bes_base, "cache": cache,
+               "catalogue_key": stable_hash(dpu_index.records, bes_base)}
+    workers = min(workers or os.cpu_count() or 1, max(len(sites), 1))
+    if workers == 1:
+        _init_worker(context)
+        return list(map(run_site, sites))
+    chunksize = max(1, len(sites) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(context,)) as pool:
+        return list(pool.map(run_site, sites, chunksize=chunksize))
+
+
+def write_summary(rows: list[dict], path) -> Path:
+    """Итог в CSV или JSON (по расширению файла)."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        path.write_text(json.dumps(rows, ensure_ascii=False, indent=2) + "\n",
+                        encoding="utf-8")
+    else:
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный расчет объектов по файлу сценариев")
+    parser.add_argument("config", help="файл сценариев .json или .toml")
+    parser.add_argument("--out", default="summary.csv", help="файл итога: .csv или .json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="число процессов (по умолчанию — по числу ядер)")
+    parser.add_argument("--data-dir", type=Path, default=None,
+                        help="каталог с книгами Excel каталогов оборудования")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="каталог кэша результатов (по умолчанию <кэш Practise>/memo)")
+    parser.add_argument("--cache-mb", type=int, default=512,
+                        help="предельный размер кэша результатов, МБ")
+    parser.add_argument("--no-cache", action="store_true", help="не использовать кэш результатов")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    cache = None if args.no_cache else DiskCache(args.cache_dir, args.cache_mb * 2**20)
+    rows = run_batch(read_config(args.config), args.workers, args.data_dir, cache)
+    failed = [row for row in rows if row["error"]]
+    for row in failed:
+        print(f"{row['name']}: {row['error']}")
+    print(f"Объектов: {len(rows)}, с ошибками: {len(failed)}. "
+          f"Итог: {write_summary(rows, args.out)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
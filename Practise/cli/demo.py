@@ -1,8 +1,13 @@
-import pandas as pd
+import argparse
+import os
 
+from Practise import instrumentation
 from Practise import (LoadType, TotalLoad, HourlyDemand,
-                      DemandVisualizer, DieselPowerUnit, DieselGenerator,
-                      HydroPowerPlant, BESbank, BES, PCS)
+                      DemandVisualizer, DieselGenerator,
+                      HydroPowerPlant, BESbank)
+from Practise.Catalogue import loader as catalogue
+from Practise.Results.ResultsStore import ResultsWriter, ResultsStore
+import numpy as np
 
 
 def build_consumers():
@@ -48,92 +53,83 @@ def demand_visualizer(type):
         case "monthly": viz.plot_month("Январь")
         case "daily": viz.plot_day("Январь", 1)
 
+def export_demand_figures(out_dir="figures"):
+    hourlydemand = HourlyDemand(build_consumers().total_active_lp(), *load_graph_params())
+    return DemandVisualizer(hourlydemand).export(out_dir, days=[("Январь", 1)],
+                                                 formats=("png", "svg"))
+
 def dpu_base():
-    url = ("https://github.com/H2K2U/ASES_Practise_1/raw/refs/heads/main/"
-           "Practise/data/%D0%9F%D0%B0%D1%80%D0%B0%D0%BC%D0%B5%D1%82%D1%80%D1%8B"
-           "%20%D0%B4%D0%B8%D0%B7%D0%B5%D0%BB%D1%8C%D0%BD%D1%8B%D1%85%20"
-           "%D1%81%D1%82%D0%B0%D0%BD%D1%86%D0%B8%D0%B9.xlsx")
-
-    df = pd.read_excel(url, sheet_name="Лист1")
-    dpu_base = []
-    for _, row in df.iterrows():
-        dpu = DieselPowerUnit(name=row["Марка генератора"],
-                              rated_active_power=row["Pном (кВт)"],
-                              rated_apparent_power=row["Sном (кВА)"],
-                              peak_active_power=row["Pпик (кВт)"],
-                              number_of_phases=row["К-во фаз"],
-                              rated_voltage=row["U (кВ)"],
-                              spec_fuel_cons=row["q (л/кВт*ч)"]
-                              )
-        dpu_base.append(dpu)
-    dpu_base = list(filter(lambda dpu: dpu.rated_apparent_power, dpu_base))
-    return dpu_base
+    return catalogue.dpu_base()
 
 def bes_base():
-    url = ("https://github.com/H2K2U/ASES_Practise_1/raw/refs/heads/main/"
-           "Practise/data/%D0%9F%D0%B0%D1%80%D0%B0%D0%BC%D0%B5%D1%82%D1%80%D1%8B"
-           "%20%D0%B0%D0%BA%D0%BA%D1%83%D0%BC%D1%83%D0%BB%D1%8F%D1%82%D0%BE%D1%80"
-           "%D0%BD%D1%8B%D1%85%20%D0%B1%D0%B0%D1%82%D0%B0%D1%80%D0%B5%D0%B9.xlsx")
-
-    df = pd.read_excel(url, sheet_name="Лист1")
-
-    bes_base = []
-    for _, row in df.iterrows():
-        bes = BES(
-            name=row["Тип литий-ионных аккумуляторов"],
-            rated_voltage=row["Uном, В"],
-            rated_capacity=row["Cном, Ah"],
-            specific_energy=row["Удельная энергия, Вт*ч/кг"],
-            weight=row["Масса, кг"],
-            price=row["Цена, руб"],
-            geometry=(row["Длина"], row["Ширина"], row["Высота"])
-        )
-        bes_base.append(bes)
-    bes_base = list(filter(lambda bes: bes.rated_capacity, bes_base))
-    return bes_base
+    return catalogue.bes_base()
 
 def pcs_base():
-    url = ("https://github.com/H2K2U/ASES_Practise_1/raw/refs/heads/main/"
-           "Practise/data/%D0%9F%D0%B0%D1%80%D0%B0%D0%BC%D0%B5%D1%82%D1%80%"
-           "D1%8B%20%D0%B0%D0%BA%D0%BA%D1%83%D0%BC%D1%83%D0%BB%D1%8F%D1%82%D0%"
-           "BE%D1%80%D0%BD%D1%8B%D1%85%20%D0%B8%D0%BD%D0%B2%D0%B5%D1%80%"
-           "D1%82%D0%BE%D1%80%D0%BE%D0%B2.xlsx")
-
-    df = pd.read_excel(url, sheet_name="Лист1")
-
-    pcs_base = []
-    for _, row in df.iterrows():
-        pcs = PCS(
-            name=row["Тип"],
-            rated_active_power=row["Pном, кВт"],
-            max_active_power=row["Pmax, кВт"],
-            peak_active_power=row["Pпик, кВт"],
-            input_voltage=row["Uвх, В"],
-            output_voltage=row["Uвых, В"],
-            max_capacity=row["Cmax, Ah"],
-            price=row["Цена, руб"],
-        )
-        pcs_base.append(pcs)
-    pcs_base = list(filter(lambda pcs: pcs.rated_active_power, pcs_base))
-    return pcs_base
+    return catalogue.pcs_base()
 
 def assembly_dg(name, assembly_type):
     dg = DieselGenerator(name, assembly_type)
     dg.auto_assembly_dg(dpu_base(), build_consumers().total_active_lp())
     return dg
 
-def main():
+def save_results(path, hourly_demand, hpp):
+    load = hourly_demand.year_array()
+    hydro = hpp.hourly_power(0, len(load))
+    with ResultsWriter(path, {"demand": "f8", "hpp_surplus": "f8"},
+                       attrs={"hpp": hpp.name}) as writer:
+        writer.append(demand=load, hpp_surplus=np.maximum(hydro - load, 0))
+    return ResultsStore(path)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Демонстрационный расчет микросети")
+    parser.add_argument("--profile", action="store_true",
+                        default=instrumentation.enabled(),
+                        help="замеры по этапам (также PRACTISE_PROFILE=1)")
+    parser.add_argument("--profile-out", default=os.environ.get("PRACTISE_PROFILE_OUT",
+                                                                "profile.json"),
+                        help="файл отчета: .json или .csv")
+    parser.add_argument("--cprofile-dir", default=None,
+                        help="каталог для дампов cProfile по этапам")
+    parser.add_argument("--results", default=None,
+                        help="каталог хранилища почасовых результатов (ResultsStore)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        instrumentation.enable(args.cprofile_dir)
+
     #demand_visualizer("daily")
-    dg = assembly_dg("Ядерная", "2x50")
+    with instrumentation.stage("catalogue"):
+        # все каталоги читаются сразу на пуле потоков
+        for report in catalogue.ingest_all().values():
+            for bad in report.bad_rows:
+                print(f"{report.path}, строка {bad.row}: {bad.field}={bad.value!r} — "
+                      f"{bad.reason}{' (отброшена)' if bad.dropped else ''}")
+        base = dpu_base()
+    with instrumentation.stage("dg_assembly"):
+        dg = DieselGenerator("Ядерная", "2x50")
+        dg.auto_assembly_dg(base, build_consumers().total_active_lp())
     print(build_consumers().total_apparent_lp())
     dg.show_table()
     print(dg.rated_apparent_power)
 
-    hourly_demand = HourlyDemand(build_consumers().total_active_lp(), *load_graph_params())
-    bes_bank = BESbank()
-    chen = bes_bank.charge_energy(hourly_demand, build_hpp())
+    with instrumentation.stage("demand"):
+        hourly_demand = HourlyDemand(build_consumers().total_active_lp(), *load_graph_params())
+        hourly_demand()
+    with instrumentation.stage("charge_energy"):
+        bes_bank = BESbank()
+        chen = bes_bank.charge_energy(hourly_demand, build_hpp())
     print(chen)
 
+    if args.results:
+        with instrumentation.stage("results"):
+            save_results(args.results, hourly_demand, build_hpp())
+        print(f"Результаты: {args.results}")
+
+    if args.profile:
+        print(f"Отчет о замерах: {instrumentation.write_report(args.profile_out)}")
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
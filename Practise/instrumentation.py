@@ -0,0 +1,127 @@
+"""
+Легкие таймеры и счетчики вызовов по этапам расчета.
+
+Выключены по умолчанию и тогда почти ничего не стоят: декоратор timed и
+stage лишь проверяют флаг. Включаются enable() (флаг --profile в cli/demo.py)
+или переменной окружения PRACTISE_PROFILE=1.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+import csv
+import json
+import os
+import threading
+
+_enabled = os.environ.get("PRACTISE_PROFILE", "") not in ("", "0")
+_cprofile_dir: Optional[Path] = None
+# имя -> [число вызовов, суммарное время, с]
+_timers: dict[str, list] = {}
+_counters: dict[str, int] = {}
+# замеры приходят и из потоков (ingest_all): обновления сумм — под блокировкой
+_lock = threading.Lock()
+
+
+def enable(cprofile_dir=None) -> None:
+    """Включить замеры; при cprofile_dir каждый этап stage пишет дамп cProfile."""
+    global _enabled, _cprofile_dir
+    _enabled = True
+    _cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+    if _cprofile_dir:
+        _cprofile_dir.mkdir(parents=True, exist_ok=True)
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def _add(name: str, seconds: float) -> None:
+    with _lock:
+        entry = _timers.get(name)
+        if entry is None:
+            _timers[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+
+def count(name: str, n: int = 1) -> None:
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def stage(name: str):
+    """Замер этапа: with stage("demand"): ..."""
+    if not _enabled:
+        yield
+        return
+    profiler = None
+    if _cprofile_dir is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, perf_counter() - start)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(_cprofile_dir / f"{name}.prof")
+
+
+def timed(name: str):
+    """Декоратор: время и число вызовов функции под именем name."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _add(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def report() -> list[dict]:
+    """Строки отчета: таймеры (calls, total_s, mean_s) и счетчики (calls)."""
+    with _lock:
+        rows = [{"name": name, "calls": calls, "total_s": total, "mean_s": total / calls}
+                for name, (calls, total) in _timers.items()]
+        rows += [{"name": name, "calls": n, "total_s": None, "mean_s": None}
+                 for name, n in _counters.items()]
+    return rows
+
+
+def write_report(path) -> Path:
+    """Отчет в JSON или CSV (по расширению файла)."""
+    path = Path(path)
+    rows = report()
+    if path.suffix.lower() == ".csv":
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["name", "calls", "total_s", "mean_s"])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        path.write_text(json.dumps(rows, ensure_ascii=False, indent=2) + "\n",
+                        encoding="utf-8")
+    return path
@@ -0,0 +1,316 @@
+"""
+Замеры производительности расчетных моделей на синтетических данных.
+
+    python benchmarks/bench.py                      # все масштабы, вывод таблицы
+    python benchmarks/bench.py --scale site-year    # один масштаб
+    python benchmarks/bench.py --save               # записать benchmarks/baseline.json
+    python benchmarks/bench.py --check              # сравнить с baseline.json
+    python benchmarks/bench.py --check --repeat 9   # то же с меньшим шумом
+
+Каждый запуск замера получает новые объекты с новым содержимым, так что
+замеряется расчет, а не повторное чтение кэшей; из --repeat запусков
+берется лучшее время.
+
+При --check код возврата 1, если какой-либо замер медленнее базового
+больше чем в --threshold раз или для замера нет базового значения (новый
+замер — повод перезаписать baseline.json через --save).
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+from Practise.LoadGraph.CalendarDemand import CalendarDemand
+from Practise.LoadGraph import resample
+from Practise.LoadGraph.LoadType import LoadType
+from Practise.LoadGraph.TotalLoad import TotalLoad
+from Practise.LoadGraph.DemandVisualizer import DemandVisualizer
+from Practise.Generators.Diesel.DieselPowerUnit import DieselPowerUnit
+from Practise.Generators.Diesel.DieselGenerator import DieselGenerator
+from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant
+from Practise.Storage.BESbank import BESbank
+from Practise.Catalogue.CatalogueIndex import CatalogueIndex
+from Practise.Dispatcher.dispatch import Dispatcher
+from Practise.Dispatcher.controller import DispatchController
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# масштаб: (число объектов, число лет)
+SCALES = {
+    "site-year": (1, 1),
+    "fleet": (10, 5),
+    "lifetime": (100, 25),
+}
+
+DAILY_LOAD_SCHEDULE = [15, 15, 25, 70, 60, 70, 80, 55, 70, 100, 65, 30]
+SEASON_FACTORS = {"Январь": 1.0, "Февраль": 1.0, "Март": 0.9, "Апрель": 0.8,
+                  "Май": 0.8, "Июнь": 0.7, "Июль": 0.7, "Август": 0.7,
+                  "Сентябрь": 0.8, "Октябрь": 0.9, "Ноябрь": 0.9, "Декабрь": 1.0}
+MONTHS = list(SEASON_FACTORS)
+
+
+def site_years(rng: np.random.Generator, n_sites: int,
+               years: int) -> list[list[tuple[HourlyDemand, HydroPowerPlant]]]:
+    """
+    Синтетические объекты по годам: нагрузка 100–600 кВт, МГЭС 20–50 % от
+    нагрузки. Год от года нагрузка, график и сезонность объекта немного
+    меняются, а МГЭС — по водности года, поэтому ни один год не повторяет
+    другой (и кэши по содержимому не подменяют расчет).
+    """
+    result = []
+    for i in range(n_sites):
+        load = float(rng.uniform(100, 600))
+        season = {m: f * float(rng.uniform(0.9, 1.1)) for m, f in SEASON_FACTORS.items()}
+        schedule = [x * float(rng.uniform(0.8, 1.2)) for x in DAILY_LOAD_SCHEDULE]
+        share = float(rng.uniform(0.2, 0.5))
+        site = []
+        for year in range(years):
+            year_load = load * float(rng.uniform(0.97, 1.05)) ** year
+            site.append((
+                HourlyDemand(year_load, [x * float(rng.uniform(0.97, 1.03)) for x in schedule],
+                             {m: f * float(rng.uniform(0.97, 1.03)) for m, f in season.items()}),
+                HydroPowerPlant(f"МГЭС-{i}", year_load * share * float(rng.uniform(0.8, 1.2)))))
+        result.append(site)
+    return result
+
+
+def dpu_catalogue(n: int = 5000, seed: int = 0) -> list[DieselPowerUnit]:
+    """Синтетический каталог ДЭУ реалистичного размера, в случайном порядке."""
+    rng = np.random.default_rng(seed)
+    rated = np.round(rng.uniform(5, 2000, n), 1)
+    return [DieselPowerUnit(f"ДЭУ-{i}", p, p * 1.25, p * 1.1, 3, 0.4,
+                            float(rng.uniform(0.19, 0.41)))
+            for i, p in enumerate(rated.tolist())]
+
+
+def timed(fn, prepare, repeat: int = 5) -> float:
+    """
+    Лучшее время fn(prepare()) из repeat запусков, с; prepare не замеряется
+    и на каждый запуск готовит новые данные.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        data = prepare()
+        start = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cases(scale: str) -> tuple[dict, Callable]:
+    """Замеры масштаба и подготовка данных для них (новые объекты на каждый запуск)."""
+    n_sites, years = SCALES[scale]
+    rng = np.random.default_rng(0)
+    catalogue = dpu_catalogue()
+    dg = DieselGenerator("ДЭС", "2x50")
+    dg.auto_assembly_dg(catalogue, 400)
+    days_in_month = HourlyDemand.get_days_in_month()
+
+    def prepare():
+        return site_years(rng, n_sites, years)
+
+    def each(data):
+        for site in data:
+            yield from site
+
+    def demand_year(data):
+        for hd, _ in each(data):
+            hd()
+
+    def demand_month(data):
+        for hd, _ in each(data):
+            for m in days_in_month:
+                hd(m)
+
+    def demand_day(data):
+        for hd, _ in each(data):
+            for m, days in days_in_month.items():
+                for d in range(1, days + 1):
+                    hd(m, d)
+
+    def demand_1min(data):
+        # минутный ряд в float32 и обратное укрупнение до часа (пики для ДЭУ/ПСК)
+        for hd, _ in each(data):
+            fine = HourlyDemand(hd.total_active_lp, hd.daily_load_schedule,
+                                hd.season_factors, dtype=np.float32)
+            resample.downsample(fine.series(1), 60, "max")
+
+    def calendar_stream(data):
+        for i, site in enumerate(data):
+            hd = site[0][0]
+            cd = CalendarDemand(hd.total_active_lp, hd.daily_load_schedule,
+                                hd.season_factors, 2025, years, noise=0.05, seed=i)
+            for _ in cd.stream():
+                pass
+
+    def charge_energy(data):
+        bank = BESbank()
+        for hd, hpp in each(data):
+            bank.charge_energy(hd, hpp)
+
+    def number_of_bes(data):
+        bank = BESbank()
+        for hd, hpp in each(data):
+            bank.number_of_bes(hd, hpp, 0.2, 3.2)
+
+    def what_if_edits(data):
+        # правка одного коэффициента сезонности и пересчет суток наибольшего избытка
+        bank = BESbank()
+        for site in data:
+            hd, hpp = site[0]
+            bank.charge_energy(hd, hpp)
+            for i in range(12 * years):
+                month = MONTHS[i % 12]
+                hd.season_factors[month] = hd.season_factors[month] * (1 + 0.001 * (i + 1))
+                bank.charge_energy(hd, hpp)
+
+    def assembly_dg(data):
+        for site in data:
+            for pattern in ("2x50", "2x40+20", "3x30+10", "4x25"):
+                DieselGenerator("ДЭС", pattern).auto_assembly_dg(catalogue, site[0][0].total_active_lp)
+
+    def assembly_dg_indexed(data):
+        index = CatalogueIndex(catalogue, "rated_apparent_power")
+        for site in data:
+            for pattern in ("2x50", "2x40+20", "3x30+10", "4x25"):
+                DieselGenerator("ДЭС", pattern).auto_assembly_dg(index, site[0][0].total_active_lp)
+
+    def total_load_edits(data):
+        # фидер на 1000 потребителей на объект: добавление по одному вперемешку
+        # с правками мощности уже добавленных и запросом сумм
+        for site in data:
+            register = TotalLoad()
+            loads = []
+            for i in range(1000):
+                load = LoadType("Жилой сектор" if i % 3 else "Освещение",
+                                site[0][0].total_active_lp / 1000, 0.95)
+                register.append_load(load)
+                loads.append(load)
+                loads[i // 2].load_power *= 1.01
+                register.total_apparent_lp()
+                if i % 100 == 0:
+                    register.totals_by_type()
+            register.totals_by_type()
+
+    def controller_steps(data):
+        # пошаговая диспетчеризация: почасовые измерения каждого года объекта
+        for site in data:
+            step = DispatchController(Dispatcher(site[0][1], BESbank(), dg, bes_energy=300)).step
+            for hd, hpp in site:
+                hydro = hpp.rated_active_power
+                for value in hd().tolist():
+                    step(value, hydro)
+
+    def visualizer_aggregates(data):
+        for hd, _ in each(data):
+            viz = DemandVisualizer(hd)
+            viz.monthly_stats()
+            viz.decimate(hd(), viz.max_points)
+
+    return {
+        "hourly_demand_year": demand_year,
+        "hourly_demand_month": demand_month,
+        "hourly_demand_day": demand_day,
+        "hourly_demand_1min": demand_1min,
+        "calendar_demand_stream": calendar_stream,
+        "bes_charge_energy": charge_energy,
+        "bes_number_of_bes": number_of_bes,
+        "bes_what_if_edits": what_if_edits,
+        "dg_auto_assembly": assembly_dg,
+        "dg_auto_assembly_indexed": assembly_dg_indexed,
+        "total_load_edits": total_load_edits,
+        "controller_steps": controller_steps,
+        "visualizer_aggregates": visualizer_aggregates,
+    }, prepare
+
+
+def import_time() -> float:
+    """Время холодного `import Practise` в отдельном процессе, с."""
+    code = ("import time; t = time.perf_counter(); import Practise; "
+            "from Practise import HourlyDemand, BESbank; print(time.perf_counter() - t)")
+    return min(float(subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                                    capture_output=True, text=True).stdout)
+               for _ in range(3))
+
+
+def run(scales: list[str], repeat: int = 5) -> dict[str, dict[str, float]]:
+    results = {"import": {"import_practise": import_time()}}
+    for scale in scales:
+        scale_cases, prepare = cases(scale)
+        results[scale] = {name: timed(fn, prepare, repeat) for name, fn in scale_cases.items()}
+    return results
+
+
+def check(results: dict, baseline: dict, threshold: float,
+          min_delta: float = 0.001) -> list[str]:
+    """
+    Замеры, ставшие медленнее базовых более чем в threshold раз и при этом
+    больше чем на min_delta с (короткие замеры слишком шумные).
+    """
+    slower = []
+    for scale, timings in results.items():
+        for name, seconds in timings.items():
+            base = baseline.get("results", {}).get(scale, {}).get(name)
+            if base is not None and seconds > base * threshold and seconds - base > min_delta:
+                slower.append(f"{scale}/{name}: {seconds:.4f} с против {base:.4f} с")
+    return slower
+
+
+def missing(results: dict, baseline: dict) -> list[str]:
+    """Замеры, для которых в baseline нет базового значения."""
+    base = baseline.get("results", {})
+    return [f"{scale}/{name}" for scale, timings in results.items()
+            for name in timings if name not in base.get(scale, {})]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", action="append", choices=list(SCALES),
+                        help="масштаб (можно несколько раз), по умолчанию все")
+    parser.add_argument("--save", action="store_true", help="записать результаты как базовые")
+    parser.add_argument("--check", action="store_true", help="сравнить с базовыми")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="допустимое замедление относительно базовых, раз")
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="замедление меньше этого, с, не считается регрессией")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="запусков каждого замера, берется лучший (больше — меньше шум)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    args = parser.parse_args(argv)
+
+    results = run(args.scale or list(SCALES), args.repeat)
+    for scale, timings in results.items():
+        for name, seconds in timings.items():
+            print(f"{scale:<10} {name:<28} {seconds * 1e3:10.3f} мс")
+
+    if args.save:
+        args.baseline.write_text(json.dumps({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if args.check:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        slower = check(results, baseline, args.threshold, args.min_delta)
+        for line in slower:
+            print("МЕДЛЕННЕЕ:", line)
+        absent = missing(results, baseline)
+        for line in absent:
+            print("НЕТ БАЗОВОГО ЗАМЕРА:", line)
+        return 1 if slower or absent else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
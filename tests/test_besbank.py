@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from Practise import instrumentation
+from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant, HOURS_PER_YEAR
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+from Practise.Storage import BESbank as module
+from Practise.Storage.BESbank import BESbank
+
+SCHEDULE = [15, 15, 25, 70, 60, 70, 80, 55, 70, 100, 65, 30]
+
+
+def demand():
+    season = {m: 0.7 + 0.03 * i for i, m in enumerate(HourlyDemand.get_days_in_month())}
+    return HourlyDemand(100, SCHEDULE, season)
+
+
+@pytest.fixture
+def counters():
+    module._SURPLUS_CACHE.clear()
+    instrumentation.enable()
+    instrumentation.reset()
+    yield lambda: {row["name"]: row["calls"] for row in instrumentation.report()}
+    instrumentation.reset()
+    instrumentation.disable()
+
+
+def test_equal_profiles_share_entries(counters):
+    hpp = HydroPowerPlant("МГЭС", 80)
+    first = BESbank().charge_energy(demand(), hpp)
+    assert BESbank().charge_energy(demand(), hpp) == first
+    assert counters()["BESbank.surplus_cache.hit"] == 1
+
+
+def test_edit_recomputes_changed_months(counters):
+    rng = np.random.default_rng(0)
+    hpp = HydroPowerPlant.from_capacity_factor("МГЭС", 120, rng.uniform(0, 1, HOURS_PER_YEAR))
+    hd = demand()
+    bank = BESbank()
+    bank.charge_energy(hd, hpp)
+    hd.season_factors["Июль"] *= 1.2
+    assert bank.charge_energy(hd, hpp) == bank.charge_energy(demand_like(hd), hpp)
+    assert counters()["BESbank.surplus_cache.months"] == 1
+    np.testing.assert_array_equal(bank.surplus_energy(hd, hpp),
+                                  bank.surplus_energy(demand_like(hd), hpp))
+
+
+def demand_like(hd):
+    # новый объект с теми же данными, но пересчитанный с нуля
+    module._SURPLUS_CACHE.clear()
+    return HourlyDemand(hd.total_active_lp, SCHEDULE, dict(hd.season_factors))
+
+
+def test_cache_is_bounded(monkeypatch, counters):
+    monkeypatch.setattr(module, "_SURPLUS_CACHE_SIZE", 4)
+    hd = demand()
+    for rated in range(10):
+        BESbank().charge_energy(hd, HydroPowerPlant("МГЭС", 50.0 + rated))
+    assert len(module._SURPLUS_CACHE) == 4
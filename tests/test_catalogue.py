@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import numpy as np
+
+from Practise.Catalogue import loader
+
+
+def test_touched_workbook_refreshes_fingerprint(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    shutil.copytree(loader.DATA_DIR, data)
+    monkeypatch.setenv("PRACTISE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(loader, "_COLUMNS", {})
+    book = data / loader.CATALOGUES["pcs"].file
+    first = loader.load_columns("pcs", data)
+
+    # время модификации изменилось, содержимое — нет: кэш принимается по хэшу
+    stat = book.stat()
+    os.utime(book, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    hashes = []
+    file_hash = loader._file_hash
+    monkeypatch.setattr(loader, "_file_hash", lambda path: hashes.append(path) or file_hash(path))
+    for _ in range(2):
+        loader._COLUMNS.clear()
+        columns = loader.load_columns("pcs", data)
+    assert len(hashes) == 1
+    for name, column in first.items():
+        np.testing.assert_array_equal(columns[name], column)
+
+
+def test_index_of_list_is_reused_until_the_list_changes():
+    from Practise.Catalogue.CatalogueIndex import CatalogueIndex
+    from Practise.Generators.Diesel.DieselPowerUnit import DieselPowerUnit
+
+    units = [DieselPowerUnit(f"ДЭУ-{p}", p, p * 1.25, p * 1.1, 3, 0.4, 0.25)
+             for p in (80.0, 20.0, 50.0)]
+    index = CatalogueIndex.of(units, "rated_apparent_power")
+    assert CatalogueIndex.of(units, "rated_apparent_power") is index
+    assert CatalogueIndex.of(index, "rated_apparent_power") is index
+    units.append(DieselPowerUnit("ДЭУ-10", 10.0, 12.5, 11.0, 3, 0.4, 0.25))
+    fresh = CatalogueIndex.of(units, "rated_apparent_power")
+    assert fresh is not index and fresh.records[0].name == "ДЭУ-10"
+
+
+def test_ingest_nothing():
+    assert loader.ingest_all(()) == {}
@@ -0,0 +1,40 @@
+import os
+
+from Practise.Cache.DiskCache import DiskCache, ORPHAN_AGE, code_hash
+
+
+def test_memoize_key_follows_function_code(tmp_path):
+    cache = DiskCache(tmp_path)
+    calls = []
+
+    def compute(x):
+        calls.append(x)
+        return x + 1
+
+    def compute_v2(x):
+        calls.append(x)
+        return x + 2
+
+    assert code_hash(compute) != code_hash(compute_v2)
+    assert cache.memoize(compute, name="compute")(1) == 2
+    assert cache.memoize(compute, name="compute")(1) == 2
+    # та же метка, новый код: старая запись не используется
+    assert cache.memoize(compute_v2, name="compute")(1) == 3
+    assert calls == [1, 1]
+    assert cache.memoize(compute_v2, name="compute", version=1)(1) == 3
+    assert cache.memoize(compute, name="compute", version=1)(1) == 3
+
+
+def test_orphaned_temp_files_are_counted_and_evicted(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10**6)
+    cache.set("ab" + "0" * 38, b"x" * 100)
+    orphan = tmp_path / "ab" / ".ab00.123.dead.tmp"
+    orphan.write_bytes(b"y" * 1000)
+    fresh = tmp_path / "ab" / ".ab01.456.live.tmp"
+    fresh.write_bytes(b"z" * 10)
+    assert cache.size() > 1000
+    old = orphan.stat().st_mtime - ORPHAN_AGE - 1
+    os.utime(orphan, (old, old))
+    cache.evict()
+    assert not orphan.exists() and fresh.exists()
+    assert cache.get("ab" + "0" * 38) == b"x" * 100
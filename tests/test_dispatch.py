@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from Practise.Dispatcher.controller import DispatchController
+from Practise.Dispatcher.dispatch import Dispatcher
+from Practise.Dispatcher.live import run_feed
+from Practise.Generators.Diesel.DieselGenerator import DieselGenerator
+from Practise.Generators.Diesel.DieselPowerUnit import DieselPowerUnit
+from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant, HOURS_PER_YEAR
+from Practise.Invertors.PCS import PCS
+from Practise.Storage.BESbank import BESbank
+
+
+def diesel():
+    catalogue = [DieselPowerUnit(f"ДЭУ-{p}", p, p * 1.25, p * 1.1, 3, 0.4, 0.25)
+                 for p in (20.0, 50.0, 80.0, 150.0)]
+    dg = DieselGenerator("ДЭС", "2x40+20")
+    dg.auto_assembly_dg(catalogue, 200)
+    return dg
+
+
+@pytest.mark.parametrize("pcs, bes_energy, soc0", [
+    (None, 300, 1.0),
+    (PCS("ПСК", 40, 40, 60, 0.4, 0.4, 1000, 0), 500, 0.3),
+    (None, 0, 1.0),
+])
+def test_controller_matches_run(pcs, bes_energy, soc0):
+    rng = np.random.default_rng(0)
+    hours = 24 * 60
+    load = rng.uniform(20, 200, hours)
+    hpp = HydroPowerPlant.from_capacity_factor("МГЭС", 120, rng.uniform(0, 1, HOURS_PER_YEAR))
+    dispatcher = Dispatcher(hpp, BESbank(), diesel(), pcs, bes_energy=bes_energy, soc0=soc0)
+    result = dispatcher.run(load)
+
+    controller = DispatchController(dispatcher)
+    steps = np.array([controller.step(l, h).as_tuple() for l, h in zip(load, result.hpp)])
+    hpp_, bes, dg, running, fuel, soc, unserved, spilled = steps.T
+    np.testing.assert_array_equal(bes, result.bes)
+    np.testing.assert_array_equal(dg, result.dg)
+    np.testing.assert_array_equal(unserved, result.unserved)
+    np.testing.assert_array_equal(spilled, result.spilled)
+    np.testing.assert_allclose(soc, result.soc, atol=1e-12)
+    np.testing.assert_allclose(fuel, result.fuel, atol=1e-9)
+    np.testing.assert_array_equal(running, (result.dg_units > 0).sum(axis=1))
+
+
+def test_feed_counts_factory_errors():
+    hpp = HydroPowerPlant.from_capacity_factor("МГЭС", 120, np.full(HOURS_PER_YEAR, 0.5))
+    dispatcher = Dispatcher(hpp, BESbank(), diesel(), bes_energy=300)
+
+    def factory(site):
+        if site == "сломан":
+            raise RuntimeError(site)
+        return DispatchController(dispatcher)
+
+    async def source():
+        yield [b"A,100,50\n", "сломан,100,50\n".encode()]
+        yield [b"A,x,50\n", b"B,120,10\n"]
+
+    seen = []
+    stats = asyncio.run(run_feed(source(), factory, lambda site, sp: seen.append(site)))
+    assert seen == ["A", "B"]
+    assert (stats.steps, stats.bad_lines, stats.errors) == (2, 1, 1)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+
+
+def test_month_offsets_read_only():
+    offsets = HourlyDemand.month_offsets()
+    with pytest.raises(TypeError):
+        offsets["Январь"] = (1, 1)
+    assert HourlyDemand.month_offsets()["Январь"] == (0, 31)
+    assert HourlyDemand.month_offsets()["Декабрь"] == (334, 31)
+
+
+SEASON = dict.fromkeys(HourlyDemand.get_days_in_month(), 1.0)
+
+
+def test_dtype_change_rebuilds_series():
+    hd = HourlyDemand(100, [50] * 24, dict(SEASON))
+    assert hd().dtype == np.float64
+    hd.dtype = np.float32
+    assert hd().dtype == np.float32
+
+
+def test_fine_schedule_edits_reach_hourly_schedule():
+    fine = [50.0] * 96
+    hd = HourlyDemand(100, fine, dict(SEASON))
+    assert hd()[0] == pytest.approx(50)
+    fine[:4] = [10.0, 20.0, 30.0, 40.0]
+    assert hd.daily_load_schedule[0] == pytest.approx(25)
+    assert hd()[0] == pytest.approx(25)
+    assert hd.series(15)[:4] == pytest.approx([10, 20, 30, 40])
+    with pytest.raises(TypeError):
+        hd.daily_load_schedule[0] = 1
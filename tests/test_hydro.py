@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from Practise.Generators.Hydro.HydroPowerPlant import HydroPowerPlant, HOURS_PER_YEAR
+from Practise.LoadGraph.HourlyDemand import HourlyDemand
+from Practise.Storage.BESbank import BESbank
+
+SCHEDULE = [15, 15, 25, 70, 60, 70, 80, 55, 70, 100, 65, 30]
+
+
+def demand():
+    return HourlyDemand(100, SCHEDULE, dict.fromkeys(HourlyDemand.get_days_in_month(), 1.0))
+
+
+def test_short_series_rejected():
+    with pytest.raises(ValueError, match="короче года"):
+        HydroPowerPlant.from_capacity_factor("МГЭС", 80, np.ones(HOURS_PER_YEAR - 1))
+
+
+def test_cache_key_follows_series_replacement():
+    hpp = HydroPowerPlant.from_capacity_factor("МГЭС", 80, np.full(HOURS_PER_YEAR, 0.5))
+    key = hpp.cache_key()
+    assert hpp.cache_key() == key
+    hpp.availability = np.full(HOURS_PER_YEAR, 0.25)
+    assert hpp.cache_key() != key
+
+
+def test_worst_day_reports_year():
+    series = np.full(3 * HOURS_PER_YEAR, 0.2)
+    # избыток только 10 марта второго года
+    start = HOURS_PER_YEAR + (31 + 28 + 9) * 24
+    series[start:start + 24] = 1.0
+    hpp = HydroPowerPlant.from_capacity_factor("МГЭС", 200, series)
+    energy, year, month, day = BESbank().worst_day(demand(), hpp)
+    assert (year, month, day) == (1, "Март", 10)
+    assert BESbank().charge_energy(demand(), hpp) == (energy, ["Март", 10])
@@ -0,0 +1,20 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CODE = """
+import json, sys
+import Practise
+from Practise import HourlyDemand, BESbank
+print(json.dumps([m for m in ("matplotlib", "pandas") if m in sys.modules]))
+"""
+
+
+def test_import_does_not_load_matplotlib_or_pandas():
+    # время импорта замеряет benchmarks/bench.py (import_practise)
+    loaded = subprocess.run([sys.executable, "-c", CODE], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    assert json.loads(loaded) == []
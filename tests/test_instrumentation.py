@@ -0,0 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from Practise import instrumentation
+
+
+def test_counts_from_threads_are_not_lost():
+    instrumentation.enable()
+    instrumentation.reset()
+    try:
+        def work(_):
+            for _ in range(2000):
+                instrumentation.count("test.calls")
+                with instrumentation.stage("test.stage"):
+                    pass
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(work, range(8)))
+        rows = {row["name"]: row["calls"] for row in instrumentation.report()}
+        assert rows == {"test.stage": 16000, "test.calls": 16000}
+    finally:
+        instrumentation.reset()
+        instrumentation.disable()
@@ -0,0 +1,27 @@
+import numpy as np
+
+from Practise.Dispatcher.sweep import pareto_ranks
+
+
+def brute_force_ranks(obj):
+    ranks = np.full(len(obj), -1)
+    rank = 0
+    while (ranks < 0).any():
+        remaining = np.flatnonzero(ranks < 0)
+        front = [i for i in remaining
+                 if not any(np.all(obj[j] <= obj[i]) and np.any(obj[j] < obj[i])
+                            for j in remaining)]
+        ranks[front] = rank
+        rank += 1
+    return ranks
+
+
+def test_pareto_ranks_match_definition():
+    rng = np.random.default_rng(0)
+    # целые значения дают много совпадений и равных по критерию вариантов
+    for obj in (rng.integers(0, 6, (300, 3)).astype(float), rng.uniform(0, 1, (300, 2))):
+        np.testing.assert_array_equal(pareto_ranks(obj, block=32), brute_force_ranks(obj))
+
+
+def test_pareto_ranks_empty():
+    assert pareto_ranks(np.zeros((0, 3))).size == 0
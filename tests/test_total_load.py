@@ -0,0 +1,79 @@
+import copy
+import dataclasses
+import gc
+import pickle
+
+import pytest
+
+from Practise.LoadGraph.LoadType import LoadType
+from Practise.LoadGraph.TotalLoad import TotalLoad
+
+
+def loads():
+    return [LoadType("Жилой сектор", 67, 0.95), LoadType("Освещение", 10, 0.9)]
+
+
+def test_asdict_on_registered_load():
+    load, other = loads()
+    total = TotalLoad([load, other])
+    assert dataclasses.asdict(load) == {"lp_type": "Жилой сектор", "_LoadType__load_power": 67,
+                                        "cosf": 0.95, "rated_voltage": 0.4}
+    assert dataclasses.asdict(total)["load_list"][1]["lp_type"] == "Освещение"
+    assert len(dataclasses.astuple(total)[0]) == 2
+
+
+def test_totals_follow_load_power():
+    load, other = loads()
+    total = TotalLoad([load])
+    total.append_load(other)
+    load.load_power = 100
+    assert total.total_active_lp() == pytest.approx(110)
+    assert total.total_apparent_lp() == pytest.approx(100 * 0.95 + 10 * 0.9)
+    total.delete_load(0)
+    load.load_power = 1
+    assert total.total_active_lp() == pytest.approx(10)
+
+
+def test_owner_is_not_kept_alive():
+    load, _ = loads()
+    total = TotalLoad([load])
+    gc.collect()
+    del total
+    gc.collect()
+    load.load_power = 5
+    assert load._owners == []
+
+
+@pytest.mark.parametrize("clone", [copy.deepcopy, lambda t: pickle.loads(pickle.dumps(t))])
+def test_copies_are_independent(clone):
+    total = TotalLoad(loads())
+    twin = clone(total)
+    twin.load_list[0].load_power = 0
+    assert total.total_active_lp() == pytest.approx(77)
+    assert twin.total_active_lp() == pytest.approx(10)
+
+
+def test_equal_registers_are_separate_owners():
+    load, other = loads()
+    first, second = TotalLoad([load, other]), TotalLoad([load, other])
+    assert first == second
+    first._rebuild()
+    load.load_power = 100
+    assert first.total_active_lp() == pytest.approx(110)
+    assert second.total_active_lp() == pytest.approx(110)
+
+
+def test_power_edit_patches_one_row(monkeypatch):
+    total = TotalLoad(loads())
+    extra = LoadType("Освещение", 5, 0.8)
+    total.append_load(extra)
+    total.append_load(extra)
+    monkeypatch.setattr(total, "_rebuild", lambda: pytest.fail("полная пересборка колонок"))
+    extra.load_power = 7
+    total.append_load(LoadType("Жилой сектор", 1, 1.0))
+    assert total.power_column().tolist() == [67, 10, 7, 7, 1]
+    assert total.totals_by_type()["Освещение"]["active"] == pytest.approx(24)
+    total.delete_load(0)
+    total.load_list[0].load_power = 11
+    assert total.power_column().tolist() == [11, 7, 7, 1]
+    assert total.total_active_lp() == pytest.approx(26)